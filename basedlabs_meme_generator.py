@@ -4,6 +4,8 @@ import requests
 import base64
 import json
 from dotenv import load_dotenv
+import job_scheduler
+import job_store
 
 # Load environment variables
 load_dotenv()
@@ -13,6 +15,7 @@ BASEDLABS_API_KEY = os.getenv("BASEDLABS_API_KEY")
 
 # Configuration
 BASE_URL = "https://modelslab.com/api/v1/enterprise/video/img2video"
+FETCH_URL = "https://modelslab.com/api/v1/enterprise/video/fetch"
 REFERENCE_IMAGE_PATH = "reference image/tal.jpg"
 
 def encode_image_to_base64(image_path):
@@ -68,6 +71,7 @@ def generate_video_basedlabs(action_description):
         print("🚀 Sending request to BasedLabs...")
         response = requests.post(BASE_URL, headers=headers, data=payload)
         
+        job_scheduler.note_rate_limit(response)
         if response.status_code != 200:
             print(f"❌ API Error ({response.status_code}): {response.text}")
             return
@@ -88,18 +92,49 @@ def generate_video_basedlabs(action_description):
         elif data.get("status") == "processing":
              id = data.get("id")
              print(f"⏳ Processing... Job ID: {id}")
-             print("   (You may need to check the dashboard or implement polling if this API supports it)")
-             # Simple polling if 'fetch_result' endpoint exists, but for now just reporting.
              if data.get("future_links"):
                  print(f"🔮 Future Link (check in a minute): {data['future_links'][0]}")
-                 return data['future_links'][0]
+             if id:
+                 local_id = job_store.record_submission(
+                     "basedlabs", str(id), action_description,
+                     {k: v for k, v in json.loads(payload).items() if k not in ("key", "init_image")},
+                 )
+                 return job_store.track(local_id, poll_basedlabs_job, str(id))
 
     except Exception as e:
         print(f"❌ Error calling BasedLabs: {e}")
 
+def poll_basedlabs_job(job_id, interval=10):
+    """Poll a BasedLabs / ModelsLab job via the fetch endpoint. Returns the video URL or None."""
+    payload = json.dumps({"key": BASEDLABS_API_KEY})
+    headers = {'Content-Type': 'application/json'}
+    
+    while True:
+        time.sleep(interval)
+        response = requests.post(f"{FETCH_URL}/{job_id}", headers=headers, data=payload, timeout=30)
+        response.raise_for_status()
+        
+        data = response.json()
+        status = data.get("status")
+        print(f"📡 Status: {status}")
+        
+        if status == "success":
+            video_urls = data.get("output", [])
+            if video_urls:
+                print(f"\n🎉 Video Generated: {video_urls[0]}")
+                return video_urls[0]
+            return None
+        
+        if status in ("failed", "error"):
+            print(f"❌ BasedLabs generation failed: {data.get('message')}")
+            return None
+
 def main():
     print("🦊 TAL MEME GENERATOR (BASEDLABS EDITION)")
     
+    # Pick up jobs from a previous run instead of paying for them again
+    job_store.resume_pending_jobs(["basedlabs"])
+    
     if not os.path.exists(REFERENCE_IMAGE_PATH):
         print(f"❌ Reference image not found: {REFERENCE_IMAGE_PATH}")
         return
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
+import model_registry
 
 load_dotenv()
 
@@ -19,6 +20,9 @@ try:
     
     if video_models:
         print(f"✅ Found video models: {video_models}")
+        # Seed the capability cache so sora_meme_generator skips its own probe
+        for model_id in video_models:
+            model_registry.record_status("sora", model_id, True)
     else:
         print("⚠️ No explicit 'sora' or 'video' models found in the public list.")
         print("Listing first 10 models to verify connection:")
@@ -0,0 +1,215 @@
+import os
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# Configuration
+DEFAULT_FACTOR = 2     # 2 doubles the frame rate (one new frame between each pair)
+BLOCK_SIZE = 16        # Block size for motion estimation
+SEARCH_RANGE = 8       # Max displacement (pixels) searched in each direction
+TILE_ROWS = 128        # Rows per tile handed to a worker (rounded to BLOCK_SIZE)
+MOTION_PENALTY = 0.5   # Bias towards zero motion so flat areas don't pick random vectors
+
+
+# -----------------------------
+# BLENDING / MOTION
+# -----------------------------
+
+def blend(a, b, t):
+    """Linear cross-fade between two uint8 frames."""
+    out = a.astype(np.float32) * (1.0 - t) + b.astype(np.float32) * t
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+
+def _gray(frame):
+    return frame.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def estimate_motion(a, b, block=BLOCK_SIZE, search=SEARCH_RANGE):
+    """Full-search block matching from ``a`` to ``b``.
+
+    Frames must be a multiple of ``block`` in both dimensions. Returns an
+    int array of shape (H // block, W // block, 2) holding (dy, dx) per block.
+    The search loops over displacements only; every block is scored at once.
+    """
+    ga, gb = _gray(a), _gray(b)
+    h, w = ga.shape
+    bh, bw = h // block, w // block
+    padded = np.pad(gb, search, mode="edge")
+
+    best_sad = np.full((bh, bw), np.inf, dtype=np.float32)
+    best = np.zeros((bh, bw, 2), dtype=np.int32)
+    for dy in range(-search, search + 1):
+        for dx in range(-search, search + 1):
+            shifted = padded[search + dy:search + dy + h, search + dx:search + dx + w]
+            sad = np.abs(ga - shifted).reshape(bh, block, bw, block).sum(axis=(1, 3))
+            sad += MOTION_PENALTY * block * (abs(dy) + abs(dx))
+            better = sad < best_sad
+            best_sad[better] = sad[better]
+            best[better] = (dy, dx)
+    return best
+
+
+def motion_interpolate(a, b, t, vectors, block=BLOCK_SIZE):
+    """Bidirectional motion-compensated frame at time ``t`` between ``a`` and ``b``."""
+    h, w = a.shape[:2]
+    flow = np.repeat(np.repeat(vectors, block, axis=0), block, axis=1)[:h, :w].astype(np.float32)
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+
+    ya = np.clip(np.rint(ys - t * flow[..., 0]), 0, h - 1).astype(np.intp)
+    xa = np.clip(np.rint(xs - t * flow[..., 1]), 0, w - 1).astype(np.intp)
+    yb = np.clip(np.rint(ys + (1.0 - t) * flow[..., 0]), 0, h - 1).astype(np.intp)
+    xb = np.clip(np.rint(xs + (1.0 - t) * flow[..., 1]), 0, w - 1).astype(np.intp)
+
+    return blend(a[ya, xa], b[yb, xb], t)
+
+
+def interpolate_pair(a, b, factor=DEFAULT_FACTOR, motion=False, block=BLOCK_SIZE, search=SEARCH_RANGE):
+    """The ``factor - 1`` in-between frames for one pair (single process, no tiling)."""
+    times = [i / factor for i in range(1, factor)]
+    if not motion:
+        return [blend(a, b, t) for t in times]
+
+    h, w = a.shape[:2]
+    pad = ((0, -h % block), (0, -w % block), (0, 0))
+    pa, pb = np.pad(a, pad, mode="edge"), np.pad(b, pad, mode="edge")
+    vectors = estimate_motion(pa, pb, block, search)
+    return [motion_interpolate(pa, pb, t, vectors, block)[:h, :w] for t in times]
+
+
+# -----------------------------
+# TILED PROCESS POOL
+# -----------------------------
+
+def _interpolate_tile(src_name, dst_name, shape, pair, row0, row1, factor, motion, block, search):
+    """Worker: compute rows [row0, row1) of every in-between frame for one pair.
+
+    Input frames and output frames both live in shared memory, so only the
+    block names and tile coordinates are pickled.
+    """
+    n, h, w, c = shape
+    src = shared_memory.SharedMemory(name=src_name)
+    dst = shared_memory.SharedMemory(name=dst_name)
+    try:
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=src.buf)
+        out = np.ndarray((n - 1, factor - 1, h, w, c), dtype=np.uint8, buffer=dst.buf)
+
+        # Halo rows let blocks near the tile edge search (and warp) across it
+        halo = -(-search // block) * block if motion else 0
+        top, bottom = max(0, row0 - halo), min(h, row1 + halo)
+        a = frames[pair, top:bottom]
+        b = frames[pair + 1, top:bottom]
+
+        for k, frame in enumerate(interpolate_pair(a, b, factor, motion, block, search)):
+            out[pair, k, row0:row1] = frame[row0 - top:row1 - top]
+        del frames, out
+    finally:
+        src.close()
+        dst.close()
+
+
+def interpolate_frames(frames, factor=DEFAULT_FACTOR, motion=False, block=BLOCK_SIZE,
+                       search=SEARCH_RANGE, workers=None, tile_rows=TILE_ROWS):
+    """Raise the frame rate of a clip by ``factor``.
+
+    ``frames`` is a list (or array) of equally sized HxWx3 uint8 frames. Each
+    frame pair is split into row tiles that are processed across a process
+    pool. Returns the new list of frames, originals included.
+    """
+    frames = np.ascontiguousarray(np.stack(frames), dtype=np.uint8)
+    n, h, w, c = frames.shape
+    if n < 2 or factor < 2:
+        return list(frames)
+
+    tile_rows = max(block, tile_rows - tile_rows % block)
+    tiles = [(pair, row0, min(h, row0 + tile_rows)) for pair in range(n - 1) for row0 in range(0, h, tile_rows)]
+
+    src = shared_memory.SharedMemory(create=True, size=frames.nbytes)
+    dst = shared_memory.SharedMemory(create=True, size=(n - 1) * (factor - 1) * h * w * c)
+    try:
+        np.ndarray(frames.shape, dtype=np.uint8, buffer=src.buf)[:] = frames
+        workers = min(workers or os.cpu_count() or 1, len(tiles))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_interpolate_tile, src.name, dst.name, frames.shape,
+                                   pair, row0, row1, factor, motion, block, search)
+                       for pair, row0, row1 in tiles]
+            for future in futures:
+                future.result()
+
+        inbetween = np.ndarray((n - 1, factor - 1, h, w, c), dtype=np.uint8, buffer=dst.buf).copy()
+    finally:
+        src.close()
+        src.unlink()
+        dst.close()
+        dst.unlink()
+
+    result = []
+    for i in range(n - 1):
+        result.append(frames[i])
+        result.extend(inbetween[i])
+    result.append(frames[-1])
+    return result
+
+
+# -----------------------------
+# FILE HELPERS
+# -----------------------------
+
+def interpolate_gif(input_path, output_path, factor=DEFAULT_FACTOR, motion=False, workers=None):
+    """Interpolate a GIF, keeping its total duration."""
+    from PIL import Image
+
+    gif = Image.open(input_path)
+    frames, durations = [], []
+    for index in range(getattr(gif, "n_frames", 1)):
+        gif.seek(index)
+        frames.append(np.asarray(gif.convert("RGB")))
+        durations.append(gif.info.get("duration", 100))
+
+    result = interpolate_frames(frames, factor, motion, workers=workers)
+
+    out_durations = []
+    for duration in durations[:-1]:
+        out_durations.extend([max(20, round(duration / factor))] * factor)
+    out_durations.append(durations[-1])
+
+    images = [Image.fromarray(frame) for frame in result]
+    images[0].save(output_path, save_all=True, append_images=images[1:],
+                   duration=out_durations, loop=gif.info.get("loop", 0))
+    return output_path
+
+
+def interpolate_video(input_path, output_path, factor=DEFAULT_FACTOR, motion=False, workers=None):
+    """Interpolate an MP4 (e.g. SVD's 25 frames at 6 fps) to ``fps * factor``."""
+    import imageio.v3 as iio # pip install imageio[ffmpeg]
+
+    fps = iio.immeta(input_path).get("fps", 6)
+    frames = list(iio.imiter(input_path))
+    result = interpolate_frames(frames, factor, motion, workers=workers)
+    iio.imwrite(output_path, np.stack(result), fps=fps * factor)
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raise the frame rate of a GIF or MP4 locally on the CPU.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--factor", type=int, default=DEFAULT_FACTOR)
+    parser.add_argument("--motion", action="store_true", help="use block motion estimation instead of plain blending")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"\n{'='*60}")
+    print(f"INTERPOLATING {args.input} (x{args.factor}, {'motion' if args.motion else 'blend'})")
+    print(f"{'='*60}")
+
+    if args.input.lower().endswith(".gif"):
+        interpolate_gif(args.input, args.output, args.factor, args.motion, args.workers)
+    else:
+        interpolate_video(args.input, args.output, args.factor, args.motion, args.workers)
+    print(f"✅ Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+GIPHY_API_KEY = os.getenv("GIPHY_API_KEY")
+
+# Configuration
+SEARCH_URL = "https://api.giphy.com/v1/gifs/search"
+PAGE_SIZE = 50          # Giphy's maximum 'limit' per request
+MAX_OFFSET = 4999       # Giphy rejects offsets beyond this
+DEFAULT_WORKERS = 8
+
+_local = threading.local()
+
+
+def _session():
+    # One pooled session per worker thread keeps connections to Giphy warm
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def gif_result(gif, query):
+    """The fields we use downstream from one Giphy search hit."""
+    images = gif.get('images', {})
+    return {
+        'id': gif.get('id'),
+        'title': gif.get('title', 'Untitled'),
+        'url': images.get('original', {}).get('url'),
+        'small_url': (images.get('fixed_height_small') or images.get('downsized') or {}).get('url'),
+        'frames': int(images.get('original', {}).get('frames') or 0) or None,
+        'query': query,
+    }
+
+
+def fetch_page(query, offset, limit, rating='g'):
+    """Fetch one page. Returns (results, total_count)."""
+    params = {
+        'api_key': GIPHY_API_KEY,
+        'q': query,
+        'limit': limit,
+        'offset': offset,
+        'rating': rating,
+    }
+    response = _session().get(SEARCH_URL, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    total = data.get('pagination', {}).get('total_count', 0)
+    return [gif_result(gif, query) for gif in data.get('data', [])], total
+
+
+def iter_giphy_search(queries, per_query=100, page_size=PAGE_SIZE, workers=DEFAULT_WORKERS, rating='g'):
+    """Search many queries at once, yielding unique GIFs as pages arrive.
+
+    The first page of every query is requested immediately; further pages are
+    scheduled once ``total_count`` is known, up to ``per_query`` results per
+    query. GIFs already yielded for another query are skipped, so callers can
+    start downloading the first hits while later pages are still in flight.
+    """
+    if not GIPHY_API_KEY:
+        print("❌ ERROR: GIPHY_API_KEY not found in .env")
+        return
+
+    queries = list(dict.fromkeys(queries))
+    page_size = min(page_size, PAGE_SIZE, per_query)
+    seen = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(fetch_page, q, 0, page_size, rating): (q, 0) for q in queries}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query, offset = pending.pop(future)
+                    try:
+                        results, total = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Giphy page '{query}' @ {offset} failed: {e}")
+                        continue
+
+                    if offset == 0:
+                        last = min(total, per_query, MAX_OFFSET + 1)
+                        for next_offset in range(page_size, last, page_size):
+                            limit = min(page_size, last - next_offset)
+                            next_future = pool.submit(fetch_page, query, next_offset, limit, rating)
+                            pending[next_future] = (query, next_offset)
+
+                    for result in results:
+                        if result['id'] in seen:
+                            continue
+                        seen.add(result['id'])
+                        yield result
+        finally:
+            # Consumer stopped early: don't wait for pages nobody will read
+            for future in pending:
+                future.cancel()
+
+
+def search_many(queries, limit=100, **kwargs):
+    """Collect up to ``limit`` unique GIFs across ``queries``."""
+    results = []
+    for result in iter_giphy_search(queries, **kwargs):
+        results.append(result)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def main():
+    queries = sys.argv[1:] or ["funny", "dancing", "waving"]
+    print(f"\n{'='*60}")
+    print(f"SEARCHING GIPHY ({len(queries)} queries)")
+    print(f"{'='*60}")
+
+    count = 0
+    for count, gif in enumerate(iter_giphy_search(queries), 1):
+        print(f"{count:4}. [{gif['query']}] {gif['title'][:60]}")
+    print(f"\n✅ {count} unique GIFs")
+
+
+if __name__ == "__main__":
+    main()
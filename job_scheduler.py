@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import heapq
+import itertools
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+USAGE_FILE = "output/.scheduler_usage.json"
+DAILY_BUDGET_USD = float(os.getenv("DAILY_BUDGET_USD", "25.0"))
+STATS_WINDOW = 20          # Number of recent jobs used for latency / error rates
+RATE_LIMIT_COOLDOWN = 60   # Seconds to keep a provider idle after a 429
+
+# Per-provider limits. Costs are rough per-job estimates - adjust to your plan.
+# veo-3.x has very limited quota, so it only gets one slot and a small daily cap.
+PROVIDERS = {
+    "veo":       {"max_concurrent": 1, "daily_quota": 10,  "cost_per_job": 0.50},
+    "kling":     {"max_concurrent": 2, "daily_quota": 50,  "cost_per_job": 0.35},
+    "sora":      {"max_concurrent": 2, "daily_quota": 30,  "cost_per_job": 1.00},
+    "legnext":   {"max_concurrent": 3, "daily_quota": 100, "cost_per_job": 0.10},
+    "basedlabs": {"max_concurrent": 3, "daily_quota": 100, "cost_per_job": 0.05},
+}
+
+ROUTES = ("first", "cheapest", "fastest")
+
+
+class ProviderRateLimited(Exception):
+    """Raised by a job handler when the provider answered 429 / quota exceeded."""
+
+    def __init__(self, retry_after=None):
+        super().__init__("provider rate limited")
+        self.retry_after = retry_after
+
+
+# Generators report errors by printing and returning None, so a 429 is noted
+# here (per thread) and turned into ProviderRateLimited by the job handler.
+_rate_limit_signal = threading.local()
+
+
+def note_rate_limit(response):
+    """Remember a 429 / quota-exhausted response seen on this thread."""
+    if response.status_code != 429:
+        return
+    retry_after = response.headers.get("Retry-After")
+    _rate_limit_signal.retry_after = int(retry_after) if retry_after and retry_after.isdigit() else None
+    _rate_limit_signal.hit = True
+
+
+def clear_rate_limit():
+    _rate_limit_signal.hit = False
+
+
+def raise_if_rate_limited():
+    """Raise ProviderRateLimited if a 429 was noted on this thread since the last clear."""
+    if getattr(_rate_limit_signal, "hit", False):
+        _rate_limit_signal.hit = False
+        raise ProviderRateLimited(_rate_limit_signal.retry_after)
+
+
+class ProviderStats:
+    """Rolling latency and error rate for one provider."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+
+    def record(self, latency, ok):
+        if ok:
+            self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    def p50(self):
+        if not self.latencies:
+            return None
+        return statistics.median(self.latencies)
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class JobScheduler:
+    """Priority queue that dispatches generation jobs across providers.
+
+    Each job is submitted with a dict of ``{provider_name: handler}``; the
+    handler is called with no arguments on a worker thread and its return
+    value resolves the Future returned by ``submit``. A handler that returns
+    ``None`` counts as a failure for the provider's error rate, matching how
+    the generator functions report errors.
+    """
+
+    def __init__(self, providers=None, daily_budget=DAILY_BUDGET_USD, usage_file=USAGE_FILE):
+        self.providers = providers or PROVIDERS
+        self.daily_budget = daily_budget
+        self.usage_file = usage_file
+
+        self.stats = {name: ProviderStats() for name in self.providers}
+        self.active = {name: 0 for name in self.providers}
+        self.cooldown_until = {name: 0.0 for name in self.providers}
+        self.usage = self._load_usage()
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+
+        max_workers = sum(p["max_concurrent"] for p in self.providers.values())
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    # -----------------------------
+    # USAGE / BUDGET
+    # -----------------------------
+
+    def _load_usage(self):
+        empty = {"date": _today(), "jobs": {}, "cost": 0.0}
+        if not self.usage_file or not os.path.exists(self.usage_file):
+            return empty
+        try:
+            with open(self.usage_file, "r") as f:
+                usage = json.load(f)
+            return usage if usage.get("date") == _today() else empty
+        except Exception as e:
+            print(f"⚠️ Could not read scheduler usage ({e}), starting fresh")
+            return empty
+
+    def _save_usage(self):
+        if not self.usage_file:
+            return
+        os.makedirs(os.path.dirname(self.usage_file) or ".", exist_ok=True)
+        with open(self.usage_file, "w") as f:
+            json.dump(self.usage, f)
+
+    def _roll_day(self):
+        if self.usage["date"] != _today():
+            self.usage = {"date": _today(), "jobs": {}, "cost": 0.0}
+
+    def has_capacity(self, name):
+        """True if ``name`` has a free slot, quota left and fits the daily budget."""
+        cfg = self.providers[name]
+        self._roll_day()
+        if self.active[name] >= cfg["max_concurrent"]:
+            return False
+        if time.time() < self.cooldown_until[name]:
+            return False
+        if self.usage["jobs"].get(name, 0) >= cfg["daily_quota"]:
+            return False
+        return self.usage["cost"] + cfg["cost_per_job"] <= self.daily_budget
+
+    def _refund(self, name):
+        # A 429 means the provider never accepted the job, so it must not count twice
+        if self.usage["date"] != _today():
+            return
+        cfg = self.providers[name]
+        self.usage["jobs"][name] = max(0, self.usage["jobs"].get(name, 0) - 1)
+        self.usage["cost"] = round(max(0.0, self.usage["cost"] - cfg["cost_per_job"]), 4)
+        self._save_usage()
+
+    def _exhausted(self, name):
+        # Quota or budget can't recover until tomorrow, unlike busy slots / cooldowns
+        cfg = self.providers[name]
+        return (self.usage["jobs"].get(name, 0) >= cfg["daily_quota"]
+                or self.usage["cost"] + cfg["cost_per_job"] > self.daily_budget)
+
+    # -----------------------------
+    # ROUTING
+    # -----------------------------
+
+    def pick_provider(self, candidates, route="cheapest"):
+        """Choose a provider with free capacity from ``candidates`` using ``route``."""
+        free = [name for name in candidates if name in self.providers and self.has_capacity(name)]
+        if not free:
+            return None
+
+        if route == "cheapest":
+            return min(free, key=lambda n: (self.providers[n]["cost_per_job"], candidates.index(n)))
+        if route == "fastest":
+            # Providers without history go last so they are still tried eventually
+            def speed(name):
+                p50 = self.stats[name].p50()
+                return (p50 is None, p50 or 0.0, self.stats[name].error_rate())
+            return min(free, key=speed)
+        return free[0]
+
+    # -----------------------------
+    # QUEUE
+    # -----------------------------
+
+    def submit(self, handlers, priority=0, route="cheapest", label=None):
+        """Queue a job. Higher ``priority`` runs first. Returns a Future."""
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route '{route}', expected one of {ROUTES}")
+        unknown = [name for name in handlers if name not in self.providers]
+        if unknown:
+            raise ValueError(f"Unknown providers: {unknown}")
+
+        future = Future()
+        job = {
+            "label": label or "job",
+            "priority": priority,
+            "handlers": handlers,
+            "candidates": list(handlers),
+            "route": route,
+            "future": future,
+        }
+        with self._cond:
+            heapq.heappush(self._queue, (-priority, next(self._seq), job))
+            self._cond.notify()
+        return future
+
+    def _next_runnable(self):
+        """Pop the highest-priority job that some provider can take right now."""
+        # Roll before _exhausted so yesterday's counters never fail today's jobs
+        self._roll_day()
+        skipped = []
+        picked = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if all(self._exhausted(n) for n in job["candidates"]):
+                job["future"].set_exception(RuntimeError(
+                    f"{job['label']}: daily quota or budget exhausted for {job['candidates']}"))
+                continue
+            provider = self.pick_provider(job["candidates"], job["route"])
+            if provider:
+                picked = (job, provider)
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return picked
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                picked = self._next_runnable() if self._running else None
+                while not picked:
+                    if not self._running:
+                        return
+                    # Wake periodically so cooldowns and day rollovers are noticed
+                    self._cond.wait(timeout=1.0)
+                    picked = self._next_runnable() if self._running else None
+
+                job, provider = picked
+                cfg = self.providers[provider]
+                self.active[provider] += 1
+                self.usage["jobs"][provider] = self.usage["jobs"].get(provider, 0) + 1
+                self.usage["cost"] = round(self.usage["cost"] + cfg["cost_per_job"], 4)
+                self._save_usage()
+
+            print(f"🚦 Dispatching {job['label']} -> {provider} "
+                  f"({self.active[provider]}/{cfg['max_concurrent']} active, "
+                  f"${self.usage['cost']:.2f}/${self.daily_budget:.2f} spent today)")
+            self._executor.submit(self._run, job, provider)
+
+    def _run(self, job, provider):
+        start = time.time()
+        result, error, requeue = None, None, False
+        try:
+            result = job["handlers"][provider]()
+        except ProviderRateLimited as e:
+            wait = e.retry_after or RATE_LIMIT_COOLDOWN
+            print(f"⚠️ {provider} rate limited, cooling down for {wait}s")
+            requeue = True
+            with self._cond:
+                self.cooldown_until[provider] = time.time() + wait
+        except Exception as e:
+            error = e
+
+        latency = time.time() - start
+        with self._cond:
+            self.active[provider] -= 1
+            self.stats[provider].record(latency, error is None and result is not None and not requeue)
+            if requeue:
+                self._refund(provider)
+                heapq.heappush(self._queue, (-job["priority"], next(self._seq), job))
+            self._cond.notify_all()
+
+        if requeue:
+            return
+        if error is not None:
+            job["future"].set_exception(error)
+        else:
+            job["future"].set_result(result)
+
+    # -----------------------------
+    # REPORTING / SHUTDOWN
+    # -----------------------------
+
+    def snapshot(self):
+        """Current per-provider load, usage and health."""
+        with self._cond:
+            return {
+                name: {
+                    "active": self.active[name],
+                    "max_concurrent": cfg["max_concurrent"],
+                    "jobs_today": self.usage["jobs"].get(name, 0),
+                    "daily_quota": cfg["daily_quota"],
+                    "p50_latency": self.stats[name].p50(),
+                    "error_rate": self.stats[name].error_rate(),
+                    "cooling_down": time.time() < self.cooldown_until[name],
+                }
+                for name, cfg in self.providers.items()
+            }
+
+    def print_status(self):
+        print(f"\n{'='*60}")
+        print(f"SCHEDULER STATUS ({self.usage['date']})")
+        print(f"{'='*60}")
+        print(f"Spent today: ${self.usage['cost']:.2f} / ${self.daily_budget:.2f}")
+        for name, s in self.snapshot().items():
+            p50 = f"{s['p50_latency']:.1f}s" if s["p50_latency"] is not None else "n/a"
+            flag = " (cooling down)" if s["cooling_down"] else ""
+            print(f"{name:10} {s['active']}/{s['max_concurrent']} active  "
+                  f"{s['jobs_today']}/{s['daily_quota']} today  "
+                  f"p50 {p50}  errors {s['error_rate']:.0%}{flag}")
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._running = False
+            pending, self._queue = self._queue, []
+            self._cond.notify_all()
+        for _, _, job in pending:
+            job["future"].cancel()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import importlib
+from contextlib import closing
+
+# Configuration
+JOB_DB_PATH = "output/jobs.db"
+
+TERMINAL_STATES = ("completed", "failed")
+MAX_INTERRUPTIONS = 5          # Give up on a job after this many lost polls
+MAX_JOB_AGE = 7 * 24 * 3600    # Providers expire results long before this
+
+# provider -> (module, function). The function takes the remote id, blocks until
+# the remote job is done and returns the artifact path/URL, or None on failure.
+RESUMERS = {
+    "kling": ("klingai_meme_generator", "poll_kling_task"),
+    "sora": ("sora_meme_generator", "poll_sora_job"),
+    "legnext": ("midjourney_meme_generator", "poll_legnext_job"),
+    "basedlabs": ("basedlabs_meme_generator", "poll_basedlabs_job"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider      TEXT NOT NULL,
+    remote_id     TEXT,
+    prompt        TEXT,
+    params        TEXT,
+    state         TEXT NOT NULL,
+    artifact_path TEXT,
+    error         TEXT,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_remote ON jobs(provider, remote_id);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    state  TEXT NOT NULL,
+    detail TEXT,
+    at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events(job_id);
+"""
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect(db_path=JOB_DB_PATH):
+    """Open a connection, creating the database in WAL mode on first use."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    with _init_lock:
+        if db_path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _initialized.add(db_path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def record_submission(provider, remote_id, prompt=None, params=None, db_path=JOB_DB_PATH):
+    """Record a job the provider accepted. Returns the local job id."""
+    now = time.time()
+    with closing(_connect(db_path)) as conn, conn:
+        cur = conn.execute(
+            "INSERT INTO jobs (provider, remote_id, prompt, params, state, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'submitted', ?, ?) "
+            "ON CONFLICT(provider, remote_id) DO UPDATE SET updated_at = excluded.updated_at "
+            "RETURNING id",
+            (provider, remote_id, prompt, json.dumps(params or {}), now, now),
+        )
+        job_id = cur.fetchone()["id"]
+        conn.execute("INSERT INTO job_events (job_id, state, at) VALUES (?, 'submitted', ?)", (job_id, now))
+    return job_id
+
+
+def update_state(job_id, state, detail=None, artifact_path=None, error=None, db_path=JOB_DB_PATH):
+    """Move a job to ``state`` and append the transition to its event log."""
+    now = time.time()
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            "UPDATE jobs SET state = ?, updated_at = ?, "
+            "artifact_path = COALESCE(?, artifact_path), error = COALESCE(?, error) WHERE id = ?",
+            (state, now, artifact_path, error, job_id),
+        )
+        conn.execute(
+            "INSERT INTO job_events (job_id, state, detail, at) VALUES (?, ?, ?, ?)",
+            (job_id, state, detail or error, now),
+        )
+
+
+def get_job(job_id, db_path=JOB_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def find_job(provider, remote_id, db_path=JOB_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE provider = ? AND remote_id = ?", (provider, remote_id)
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def pending_jobs(provider=None, db_path=JOB_DB_PATH):
+    """All jobs that have not reached a terminal state, oldest first."""
+    query = f"SELECT * FROM jobs WHERE state NOT IN ({','.join('?' * len(TERMINAL_STATES))})"
+    args = list(TERMINAL_STATES)
+    if provider:
+        query += " AND provider = ?"
+        args.append(provider)
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(query + " ORDER BY created_at", args).fetchall()
+    return [dict(row) for row in rows]
+
+
+def job_events(job_id, db_path=JOB_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT state, detail, at FROM job_events WHERE job_id = ? ORDER BY at", (job_id,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def track(job_id, poll_fn, remote_id, db_path=JOB_DB_PATH):
+    """Run ``poll_fn(remote_id)`` and record the outcome against ``job_id``."""
+    update_state(job_id, "polling", db_path=db_path)
+    try:
+        artifact = poll_fn(remote_id)
+    except Exception as e:
+        # A 4xx (other than 429) means the provider doesn't know or won't serve
+        # this job any more - retrying on every startup can't fix that
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status is not None and 400 <= status < 500 and status != 429:
+            update_state(job_id, "failed", error=str(e), db_path=db_path)
+            print(f"❌ Job {remote_id} rejected by provider ({e})")
+            return None
+
+        interruptions = sum(1 for event in job_events(job_id, db_path) if event["state"] == "interrupted")
+        if interruptions + 1 >= MAX_INTERRUPTIONS:
+            update_state(job_id, "failed", error=f"gave up after {MAX_INTERRUPTIONS} interruptions: {e}", db_path=db_path)
+            print(f"❌ Giving up on job {remote_id} after {MAX_INTERRUPTIONS} interruptions")
+            return None
+
+        # Network errors and crashes are not provider failures: keep the job
+        # non-terminal so the next startup resumes it instead of resubmitting
+        update_state(job_id, "interrupted", error=str(e), db_path=db_path)
+        print(f"⚠️ Lost track of job {remote_id} ({e}); it will be resumed next run")
+        return None
+    if artifact:
+        update_state(job_id, "completed", artifact_path=artifact, db_path=db_path)
+    else:
+        update_state(job_id, "failed", error="provider reported failure", db_path=db_path)
+    return artifact
+
+
+def resume_pending_jobs(providers=None, db_path=JOB_DB_PATH):
+    """Reattach to every non-terminal job and resume polling it in the background.
+
+    Returns the started threads so callers can join them before exiting.
+    """
+    providers = providers or list(RESUMERS)
+    threads = []
+    for provider in providers:
+        jobs = []
+        for job in pending_jobs(provider, db_path):
+            if not job["remote_id"]:
+                continue
+            if time.time() - job["created_at"] > MAX_JOB_AGE:
+                update_state(job["id"], "failed", error="too old to resume", db_path=db_path)
+                continue
+            jobs.append(job)
+        if not jobs:
+            continue
+
+        module_name, fn_name = RESUMERS[provider]
+        try:
+            poll_fn = getattr(importlib.import_module(module_name), fn_name)
+        except Exception as e:
+            print(f"⚠️ Cannot resume {provider} jobs: {e}")
+            continue
+
+        for job in jobs:
+            print(f"🔁 Resuming {provider} job {job['remote_id']} (state: {job['state']})")
+            thread = threading.Thread(
+                target=track, args=(job["id"], poll_fn, job["remote_id"], db_path),
+                name=f"resume-{provider}-{job['id']}",
+            )
+            thread.start()
+            threads.append(thread)
+    return threads
+
+
+def main():
+    print(f"\n{'='*60}")
+    print(f"PENDING GENERATION JOBS ({JOB_DB_PATH})")
+    print(f"{'='*60}")
+
+    jobs = pending_jobs()
+    if not jobs:
+        print("✅ No in-flight jobs")
+        return
+
+    for job in jobs:
+        print(f"{job['id']:4}  {job['provider']:10} {job['remote_id']}  {job['state']}")
+
+    for thread in resume_pending_jobs():
+        thread.join()
+    print("\n✨ All resumed jobs finished.")
+
+
+if __name__ == "__main__":
+    main()
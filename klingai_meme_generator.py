@@ -5,6 +5,9 @@ import json
 import base64
 import jwt # pip install pyjwt
 from dotenv import load_dotenv
+import job_scheduler
+import job_store
+import model_registry
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +26,10 @@ GIPHY_API_KEY = os.getenv("GIPHY_API_KEY")
 # Or https://api-singapore.klingai.com/v1/videos/image2video
 BASE_URL = "https://api.klingai.com/v1" 
 
+# Kling has no model listing endpoint, so these are tried in order and a
+# rejected model name is remembered by model_registry for the next run.
+MODEL_NAMES = ["kling-v1", "kling-v1-5", "kling-v1-6"]
+
 TAL_DESCRIPTION = """
 A stylized anthropomorphic fox character named Tal. 
 He has the body proportions of a chunky, plush cartoon animal with short legs, rounded limbs, and a slightly oversized head. 
@@ -128,36 +135,79 @@ def generate_video_with_kling(action_description):
     }
     
     payload = {
-        "model_name": "kling-v1", # Assuming default model name, might need adjustment
         "image": image_data,
         "prompt": full_prompt,
         "cfg_scale": 0.5
     }
     
-    try:
-        print(f"🚀 Sending request to KlingAI ({url})...")
-        response = requests.post(url, headers=headers, json=payload)
+    def submit(model_name):
+        print(f"🚀 Sending request to KlingAI ({url}, {model_name})...")
+        response = requests.post(url, headers=headers, json={**payload, "model_name": model_name})
         
+        if model_registry.is_kling_model_error(response):
+            raise model_registry.ModelUnavailable(f"{response.status_code}: {response.text[:200]}")
+        
+        job_scheduler.note_rate_limit(response)
         if response.status_code != 200:
             print(f"❌ Error ({response.status_code}): {response.text}")
+            return None
+        
+        return model_name, response.json()
+    
+    try:
+        submitted = model_registry.with_fallback("kling", MODEL_NAMES, submit)
+        if not submitted:
             return
             
-        data = response.json()
+        model_name, data = submitted
         print(f"✅ Request successful!")
         print(f"Response: {data}")
         
         task_id = data.get('data', {}).get('task_id')
         if task_id:
             print(f"\n🆔 Task ID: {task_id}")
-            print("⏳ Video generation started. Please check your KlingAI dashboard or query the status.")
-            # Note: We could implement polling here if we knew the exact status endpoint.
+            print("⏳ Video generation started. Polling for the result...")
+            local_id = job_store.record_submission(
+                "kling", task_id, full_prompt,
+                {"model_name": model_name, "cfg_scale": payload["cfg_scale"]},
+            )
+            return job_store.track(local_id, poll_kling_task, task_id)
         
     except Exception as e:
         print(f"❌ Error calling KlingAI: {e}")
 
+def poll_kling_task(task_id, interval=10):
+    """Poll a KlingAI image2video task until it finishes. Returns the video URL or None."""
+    url = f"{BASE_URL}/videos/image2video/{task_id}"
+    
+    while True:
+        time.sleep(interval)
+        # Tokens are only valid for 30 minutes, so sign a fresh one per request
+        token = generate_jwt(ACCESS_KEY, SECRET_KEY_CLEAN)
+        response = requests.get(url, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        response.raise_for_status()
+        
+        task = response.json().get('data', {})
+        status = task.get('task_status')
+        print(f"📡 Status: {status}")
+        
+        if status == "succeed":
+            videos = task.get('task_result', {}).get('videos', [])
+            if videos:
+                print(f"\n🎉 VIDEO READY: {videos[0]['url']}")
+                return videos[0]['url']
+            return None
+        
+        if status == "failed":
+            print(f"❌ KlingAI generation failed: {task.get('task_status_msg')}")
+            return None
+
 def main():
     print("🦊 TAL MEME GENERATOR (KLING AI EDITION)")
     
+    # Pick up tasks from a previous run instead of paying for them again
+    job_store.resume_pending_jobs(["kling"])
+    
     # 1. Search Giphy
     query = input("Enter search query (e.g., 'dancing', 'waving'): ") or "funny"
     gifs = search_giphy(query)
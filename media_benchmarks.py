@@ -0,0 +1,268 @@
+import os
+import io
+import sys
+import glob
+import json
+import timeit
+import base64
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+
+# Configuration
+BASELINE_DIR = "benchmarks/baselines"
+BASELINE_VERSION = 2          # Bump when operations or measurement change meaning
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.15      # Fail when p50 latency or peak RSS grows by more than 15%
+MIN_SAMPLE_S = 0.2            # Each timed sample loops the operation for at least this long
+MIN_LATENCY_DELTA_S = 0.001   # Latency changes smaller than this are noise, never a regression
+
+GIF_FIXTURES = "downloads/*.gif"
+PNG_FIXTURES = "output/*.png"
+REFERENCE_IMAGE_PATH = "reference image/tal.jpg"
+
+
+# -----------------------------
+# OPERATIONS
+# -----------------------------
+# Each operation takes the fixture list and returns the number of bytes it
+# processed, which is turned into throughput.
+
+def op_gif_decode(fixtures):
+    """Decode every frame of every fixture GIF."""
+    from PIL import Image
+
+    total = 0
+    for path in fixtures["gifs"]:
+        gif = Image.open(path)
+        for index in range(getattr(gif, "n_frames", 1)):
+            gif.seek(index)
+            gif.load()
+        total += os.path.getsize(path)
+    return total
+
+
+def op_frame_extract(fixtures):
+    """Middle frame to RGB JPEG, the way analyze_gif_with_gemini does it."""
+    from PIL import Image
+
+    total = 0
+    for path in fixtures["gifs"]:
+        gif = Image.open(path)
+        gif.seek(gif.n_frames // 2)
+        buf = io.BytesIO()
+        gif.convert('RGB').save(buf, format="JPEG")
+        total += os.path.getsize(path)
+    return total
+
+
+def op_reference_base64(fixtures):
+    """Read and base64-encode the reference image, as every generator does per request."""
+    with open(fixtures["reference"], 'rb') as f:
+        data = f.read()
+    base64.b64encode(data).decode()
+    return len(data)
+
+
+def op_gif_reencode(fixtures):
+    """Decode each GIF and re-encode all frames to a new GIF."""
+    from PIL import Image
+
+    total = 0
+    for path in fixtures["gifs"]:
+        gif = Image.open(path)
+        buf = io.BytesIO()
+        gif.save(buf, format="GIF", save_all=True, loop=0)
+        total += os.path.getsize(path)
+    return total
+
+
+def op_sprite_composite(fixtures):
+    """Paste meme images into a captioned sprite sheet."""
+    from PIL import Image, ImageDraw
+
+    cell = 256
+    images = [Image.open(path).convert("RGB") for path in fixtures["pngs"]]
+    images.append(Image.open(fixtures["reference"]).convert("RGB"))
+    sheet = Image.new("RGB", (cell * len(images), cell + 40), "white")
+    draw = ImageDraw.Draw(sheet)
+    for i, image in enumerate(images):
+        image.thumbnail((cell, cell))
+        sheet.paste(image, (i * cell, 0))
+        draw.text((i * cell + 8, cell + 10), f"TAL MEME {i + 1}", fill="black")
+    buf = io.BytesIO()
+    sheet.save(buf, format="PNG")
+    return sum(os.path.getsize(p) for p in fixtures["pngs"]) + os.path.getsize(fixtures["reference"])
+
+
+OPERATIONS = {
+    "gif_decode": op_gif_decode,
+    "frame_extract": op_frame_extract,
+    "reference_base64": op_reference_base64,
+    "gif_reencode": op_gif_reencode,
+    "sprite_composite": op_sprite_composite,
+}
+
+
+# -----------------------------
+# MEASUREMENT
+# -----------------------------
+
+def load_fixtures():
+    fixtures = {
+        "gifs": sorted(glob.glob(GIF_FIXTURES)),
+        "pngs": sorted(glob.glob(PNG_FIXTURES)),
+        "reference": REFERENCE_IMAGE_PATH,
+    }
+    if not fixtures["gifs"] or not fixtures["pngs"] or not os.path.exists(REFERENCE_IMAGE_PATH):
+        raise FileNotFoundError("Benchmark fixtures missing (downloads/*.gif, output/*.png, reference image/tal.jpg)")
+    return fixtures
+
+
+def _measure(name, repeat, results):
+    """Child process: time ``repeat`` samples of the operation and report peak RSS.
+
+    Fast operations are looped inside each sample until it lasts at least
+    MIN_SAMPLE_S (the loop count is sized during warm-up) and reported per
+    call, so one scheduler hiccup can't dominate a sub-millisecond timing.
+    """
+    fixtures = load_fixtures()
+    fn = OPERATIONS[name]
+    processed = fn(fixtures)
+
+    timer = timeit.Timer(lambda: fn(fixtures))
+    number = 1
+    while timer.timeit(number) < MIN_SAMPLE_S:
+        number *= 2
+
+    latencies = [timer.timeit(number) / number for _ in range(repeat)]
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    results.put({
+        "p50_s": statistics.median(latencies),
+        "min_s": min(latencies),
+        "mean_s": statistics.fmean(latencies),
+        "throughput_mb_s": processed / statistics.median(latencies) / (1024 * 1024),
+        "peak_rss_mb": round(peak_mb, 1),
+        "calls_per_sample": number,
+    })
+
+
+def run_benchmark(name, repeat=DEFAULT_REPEAT):
+    """Run one operation in a fresh process so peak RSS is not shared between operations."""
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(name, repeat, results))
+    proc.start()
+    proc.join()
+    if proc.exitcode != 0:
+        raise RuntimeError(f"Benchmark {name} crashed (exit code {proc.exitcode})")
+    return results.get()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_all(names, repeat):
+    print(f"\n{'='*60}")
+    print(f"MEDIA BENCHMARKS ({repeat} runs each)")
+    print(f"{'='*60}")
+
+    results = {}
+    for name in names:
+        stats = run_benchmark(name, repeat)
+        results[name] = stats
+        print(f"{name:18} p50 {stats['p50_s'] * 1000:9.3f} ms  "
+              f"{stats['throughput_mb_s']:7.2f} MB/s  peak {stats['peak_rss_mb']:6.1f} MB")
+
+    return {
+        "version": BASELINE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+# -----------------------------
+# BASELINES
+# -----------------------------
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(report, name):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = baseline_path(name)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Baseline saved to: {path}")
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Print a comparison table and return the list of regressions."""
+    if baseline.get("version") != report["version"]:
+        print(f"⚠️ Baseline version {baseline.get('version')} != current {report['version']}, numbers may not be comparable")
+
+    print(f"\n{'='*60}")
+    print(f"COMPARISON AGAINST {baseline.get('commit') or 'baseline'} (threshold {threshold:.0%})")
+    print(f"{'='*60}")
+
+    regressions = []
+    for name, current in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:18} (no baseline)")
+            continue
+        for metric in ("p50_s", "peak_rss_mb"):
+            change = current[metric] / base[metric] - 1 if base[metric] else 0.0
+            regressed = change > threshold
+            if metric == "p50_s" and current[metric] - base[metric] < MIN_LATENCY_DELTA_S:
+                regressed = False
+            flag = "❌" if regressed else "✅"
+            print(f"{flag} {name:18} {metric:12} {base[metric]:10.4f} -> {current[metric]:10.4f} ({change:+.1%})")
+            if regressed:
+                regressions.append((name, metric, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU-side media processing on repo fixtures.")
+    parser.add_argument("--ops", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--save", metavar="NAME", help="store results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against a stored baseline, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_all(args.ops, args.repeat)
+
+    if args.save:
+        save_baseline(report, args.save)
+
+    if args.compare:
+        with open(baseline_path(args.compare), 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
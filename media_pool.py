@@ -0,0 +1,164 @@
+import os
+import io
+import sys
+import glob
+import time
+import base64
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+
+# Configuration
+SAMPLE_FRAMES = 4      # Frames sampled evenly across each GIF (middle frame always included)
+MAX_FRAME_SIZE = 512   # Longest side after resizing, matches what we send to Gemini
+JPEG_QUALITY = 85
+
+
+def sample_indices(n_frames, count):
+    """Evenly spaced frame indices, always including the middle frame."""
+    if n_frames <= count:
+        return list(range(n_frames))
+    step = n_frames / count
+    indices = {int(i * step + step / 2) for i in range(count)}
+    indices.add(n_frames // 2)
+    return sorted(indices)
+
+
+def _process_gif(gif_path, count, max_size, quality):
+    """Worker: decode, sample, resize and JPEG-encode one GIF.
+
+    Raw RGB frames are written into a single shared memory block; only its
+    name and the frame layout are pickled back to the parent.
+    """
+    try:
+        from PIL import Image
+
+        gif = Image.open(gif_path)
+        n_frames = getattr(gif, "n_frames", 1)
+        indices = sample_indices(n_frames, count)
+
+        frames = []
+        jpegs = []
+        for index in indices:
+            gif.seek(index)
+            frame = gif.convert("RGB")
+            frame.thumbnail((max_size, max_size))
+            frames.append(frame)
+
+            buf = io.BytesIO()
+            frame.save(buf, format="JPEG", quality=quality)
+            jpegs.append(buf.getvalue())
+
+        layout = []
+        offset = 0
+        for index, frame in zip(indices, frames):
+            size = frame.width * frame.height * 3
+            layout.append({"index": index, "size": frame.size, "offset": offset, "nbytes": size})
+            offset += size
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for entry, frame in zip(layout, frames):
+            shm.buf[entry["offset"]:entry["offset"] + entry["nbytes"]] = frame.tobytes()
+        shm_name = shm.name
+        # The parent owns the block from here on and unlinks it after copying out;
+        # drop this process's tracker registration so it isn't reported as leaked
+        resource_tracker.unregister(shm._name, "shared_memory")
+        shm.close()
+
+        return {
+            "path": gif_path,
+            "n_frames": n_frames,
+            "shm_name": shm_name,
+            "layout": layout,
+            "jpegs": jpegs,
+        }
+    except Exception as e:
+        return {"path": gif_path, "error": str(e)}
+
+
+def _collect(raw):
+    """Copy frames out of shared memory into PIL images and free the block."""
+    from PIL import Image
+
+    if "error" in raw:
+        return raw
+
+    shm = shared_memory.SharedMemory(name=raw["shm_name"])
+    try:
+        frames = []
+        for entry in raw["layout"]:
+            data = bytes(shm.buf[entry["offset"]:entry["offset"] + entry["nbytes"]])
+            frames.append(Image.frombytes("RGB", tuple(entry["size"]), data))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    indices = [entry["index"] for entry in raw["layout"]]
+    middle = indices.index(min(indices, key=lambda i: abs(i - raw["n_frames"] // 2)))
+    return {
+        "path": raw["path"],
+        "n_frames": raw["n_frames"],
+        "indices": indices,
+        "frames": frames,
+        "jpegs": raw["jpegs"],
+        "middle_jpeg_b64": base64.b64encode(raw["jpegs"][middle]).decode(),
+    }
+
+
+def iter_processed_gifs(gif_paths, workers=None, count=SAMPLE_FRAMES,
+                        max_size=MAX_FRAME_SIZE, quality=JPEG_QUALITY):
+    """Process GIFs across a process pool, yielding each result as soon as it finishes.
+
+    Each result has ``frames`` (PIL RGB images), ``jpegs`` (encoded bytes for the
+    same frames) and ``middle_jpeg_b64`` ready to send to Gemini. Failed files
+    yield ``{"path": ..., "error": ...}`` instead.
+    """
+    gif_paths = list(gif_paths)
+    if not gif_paths:
+        return
+    workers = workers or os.cpu_count() or 1
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(gif_paths)))
+    futures = [pool.submit(_process_gif, path, count, max_size, quality) for path in gif_paths]
+    collected = set()
+    try:
+        for future in as_completed(futures):
+            collected.add(future)
+            yield _collect(future.result())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        # Free blocks of results the caller never consumed (e.g. broke out early)
+        for future in futures:
+            if future in collected or future.cancelled() or future.exception():
+                continue
+            raw = future.result()
+            if "error" not in raw:
+                shm = shared_memory.SharedMemory(name=raw["shm_name"])
+                shm.close()
+                shm.unlink()
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob("downloads/*.gif"))
+    if not paths:
+        print("❌ No GIFs to process")
+        return
+
+    workers = os.cpu_count() or 1
+    print(f"\n{'='*60}")
+    print(f"PROCESSING {len(paths)} GIFs ON {workers} WORKERS")
+    print(f"{'='*60}")
+
+    start = time.time()
+    done = 0
+    for result in iter_processed_gifs(paths, workers=workers):
+        if "error" in result:
+            print(f"❌ {result['path']}: {result['error']}")
+            continue
+        done += 1
+        print(f"✅ {result['path']}: {result['n_frames']} frames, sampled {result['indices']}")
+
+    print(f"\n⏱️ {done}/{len(paths)} GIFs in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
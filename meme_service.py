@@ -0,0 +1,377 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import importlib
+import itertools
+from aiohttp import web, ClientSession, ClientTimeout # pip install aiohttp
+from dotenv import load_dotenv
+
+import job_store
+import giphy_search
+import output_store
+import job_scheduler
+from job_scheduler import JobScheduler
+
+# Load environment variables once for the whole service
+load_dotenv()
+
+# Configuration
+HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+PORT = int(os.getenv("SERVICE_PORT", "8080"))
+SEARCH_CACHE_TTL = 300  # Seconds to reuse Giphy results for the same query
+SEARCH_CACHE_MAX = 256  # Cached queries kept at most; oldest are evicted first
+DOWNLOAD_DIR = "downloads"
+
+# provider -> generator module. Modules are imported once at startup so their
+# SDKs, credentials and keys stay loaded for every request.
+PROVIDER_MODULES = {
+    "veo": "veo3_meme_generator",
+    "kling": "klingai_meme_generator",
+    "sora": "sora_meme_generator",
+    "legnext": "midjourney_meme_generator",
+    "basedlabs": "basedlabs_meme_generator",
+}
+
+
+# -----------------------------
+# PROVIDER HANDLERS
+# -----------------------------
+
+def load_providers():
+    """Import every generator module that is usable in this environment."""
+    modules = {}
+    for name, module_name in PROVIDER_MODULES.items():
+        try:
+            modules[name] = importlib.import_module(module_name)
+            print(f"✅ Loaded provider: {name}")
+        except Exception as e:
+            print(f"⚠️ Provider {name} unavailable: {e}")
+
+    # Gemini analysis lives in the Veo module but only needs GOOGLE_API_KEY,
+    # so keep it even when Vertex credentials are missing
+    analyzer = None
+    if "veo" in modules and modules["veo"].GOOGLE_API_KEY:
+        analyzer = modules["veo"].analyze_gif_with_gemini
+    else:
+        print("⚠️ GIF analysis unavailable (needs veo3_meme_generator and GOOGLE_API_KEY)")
+
+    veo_credentials = None
+    if "veo" in modules:
+        credentials, project_id = modules["veo"].load_credentials()
+        if credentials:
+            veo_credentials = (credentials, project_id)
+        else:
+            del modules["veo"]
+    return modules, veo_credentials, analyzer
+
+
+def make_handler(app, provider, generation):
+    """Build the blocking callable the scheduler runs for ``provider``."""
+    module = app["providers"][provider]
+    action = generation["action"]
+
+    def run():
+        job_scheduler.clear_rate_limit()
+        result = generate()
+        # Generators print a 429 and return None; surface it so the scheduler cools down
+        if result is None:
+            job_scheduler.raise_if_rate_limited()
+        return result
+
+    def generate():
+        if provider == "veo":
+            credentials, project_id = app["veo_credentials"]
+            prompt = (f"A video of Tal the fox character, {action}. The character has smooth golden-brown fur, "
+                      f"wearing a black tuxedo. High quality, 3d animation style.")
+            video_bytes = module.generate_veo_video(credentials, project_id, prompt, module.REFERENCE_IMAGE_PATH)
+            if not video_bytes:
+                return None
+            record = output_store.put_bytes(
+                video_bytes, ".mp4", source_gif=output_store.giphy_id(generation.get("gif_url")), prompt=prompt, provider="veo",
+            )
+            return record["path"]
+        if provider == "kling":
+            return module.generate_video_with_kling(action)
+        if provider == "sora":
+            return module.sora_generate_video(action)
+        if provider == "legnext":
+            data = module.generate_video_with_legnext(action)
+            return data.get('video_url') if data else None
+        if provider == "basedlabs":
+            return module.generate_video_basedlabs(action)
+        return None
+
+    return run
+
+
+# -----------------------------
+# PROGRESS EVENTS
+# -----------------------------
+
+def emit(generation, state, **detail):
+    """Record a progress event and wake every SSE listener for this generation."""
+    event = {"state": state, "at": time.time(), **detail}
+    generation["state"] = state
+    generation["events"].append(event)
+    for queue in generation["listeners"]:
+        queue.put_nowait(event)
+
+
+def public_view(generation):
+    return {key: generation[key] for key in ("id", "action", "providers", "state", "artifact", "events")}
+
+
+async def run_generation(app, generation, gif_url=None):
+    loop = asyncio.get_running_loop()
+
+    try:
+        if gif_url and not generation["action_given"]:
+            emit(generation, "downloading", url=gif_url)
+            gif_path = await download_reference(app, gif_url, generation["id"])
+            emit(generation, "analyzing")
+            generation["action"] = await asyncio.to_thread(app["analyzer"], gif_path)
+            emit(generation, "analyzed", action=generation["action"])
+
+        handlers = {}
+        for provider in generation["providers"]:
+            run = make_handler(app, provider, generation)
+
+            def started(provider=provider, run=run):
+                loop.call_soon_threadsafe(functools.partial(emit, generation, "generating", provider=provider))
+                return run()
+            handlers[provider] = started
+
+        emit(generation, "queued")
+        future = app["scheduler"].submit(
+            handlers, priority=generation["priority"], route=generation["route"], label=f"gen-{generation['id']}",
+        )
+        artifact = await asyncio.wrap_future(future)
+        if not artifact:
+            emit(generation, "failed", error="provider returned no video")
+            return
+        generation["artifact"] = artifact
+        emit(generation, "completed", artifact=artifact)
+    except Exception as e:
+        emit(generation, "failed", error=str(e))
+
+
+async def download_reference(app, gif_url, name):
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    path = os.path.join(DOWNLOAD_DIR, f"ref_{name}.gif")
+    async with app["http"].get(gif_url) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as f:
+            async for chunk in response.content.iter_chunked(65536):
+                f.write(chunk)
+    return path
+
+
+# -----------------------------
+# ROUTES
+# -----------------------------
+
+routes = web.RouteTableDef()
+
+
+@routes.get("/search")
+async def search(request):
+    query = request.query.get("q", "funny")
+    try:
+        limit = int(request.query.get("limit", "10"))
+    except ValueError:
+        raise web.HTTPBadRequest(text="'limit' must be an integer")
+    if limit < 1:
+        raise web.HTTPBadRequest(text="'limit' must be positive")
+    limit = min(limit, giphy_search.PAGE_SIZE)
+    if not giphy_search.GIPHY_API_KEY:
+        raise web.HTTPServiceUnavailable(text="GIPHY_API_KEY not configured")
+
+    cache = request.app["search_cache"]
+    cached = cache.get((query, limit))
+    if cached and time.time() - cached[0] < SEARCH_CACHE_TTL:
+        return web.json_response(cached[1])
+
+    try:
+        results, _ = await asyncio.to_thread(giphy_search.fetch_page, query, 0, limit)
+    except Exception as e:
+        raise web.HTTPBadGateway(text=f"Giphy error: {e}")
+
+    cache_search(cache, (query, limit), results)
+    return web.json_response(results)
+
+
+def cache_search(cache, key, results):
+    """Insert into the search cache, dropping expired entries and then the oldest ones."""
+    now = time.time()
+    for stale in [k for k, (stored_at, _) in cache.items() if now - stored_at >= SEARCH_CACHE_TTL]:
+        del cache[stale]
+    # Re-insert so the key moves to the end of the (insertion-ordered) dict
+    cache.pop(key, None)
+    cache[key] = (now, results)
+    while len(cache) > SEARCH_CACHE_MAX:
+        del cache[next(iter(cache))]
+
+
+@routes.post("/generations")
+async def create_generation(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Body must be JSON")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Body must be a JSON object")
+
+    action = body.get("action")
+    gif_url = body.get("gif_url")
+    if not action and not gif_url:
+        raise web.HTTPBadRequest(text="Provide 'action' or 'gif_url'")
+    if gif_url and not action and not request.app["analyzer"]:
+        raise web.HTTPBadRequest(text="GIF analysis is not available on this server; provide 'action'")
+
+    available = request.app["providers"]
+    providers = body.get("providers") or list(available)
+    if not isinstance(providers, list):
+        raise web.HTTPBadRequest(text="'providers' must be a list")
+    missing = [p for p in providers if p not in available]
+    if missing:
+        raise web.HTTPBadRequest(text=f"Unavailable providers: {missing}")
+
+    route = body.get("route", "cheapest")
+    if route not in job_scheduler.ROUTES:
+        raise web.HTTPBadRequest(text=f"'route' must be one of {list(job_scheduler.ROUTES)}")
+    try:
+        priority = int(body.get("priority", 0))
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text="'priority' must be an integer")
+
+    generation = {
+        "id": str(next(request.app["ids"])),
+        "action": action or "character moving",
+        "action_given": bool(action),
+        "gif_url": gif_url,
+        "providers": providers,
+        "priority": priority,
+        "route": route,
+        "state": "created",
+        "artifact": None,
+        "events": [],
+        "listeners": set(),
+    }
+    request.app["generations"][generation["id"]] = generation
+    generation["task"] = asyncio.create_task(run_generation(request.app, generation, gif_url))
+    return web.json_response(public_view(generation), status=202)
+
+
+def get_generation(request):
+    generation = request.app["generations"].get(request.match_info["gen_id"])
+    if not generation:
+        raise web.HTTPNotFound(text="Unknown generation")
+    return generation
+
+
+@routes.get("/generations/{gen_id}")
+async def generation_status(request):
+    return web.json_response(public_view(get_generation(request)))
+
+
+@routes.get("/generations/{gen_id}/events")
+async def generation_events(request):
+    """Stream progress as server-sent events until the generation finishes."""
+    generation = get_generation(request)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+    })
+    await response.prepare(request)
+
+    queue = asyncio.Queue()
+    # Replay what already happened so late subscribers see the full history
+    for event in generation["events"]:
+        queue.put_nowait(event)
+    generation["listeners"].add(queue)
+    try:
+        while True:
+            event = await queue.get()
+            await response.write(f"event: {event['state']}\ndata: {json.dumps(event)}\n\n".encode())
+            if event["state"] in ("completed", "failed"):
+                break
+    finally:
+        generation["listeners"].discard(queue)
+    return response
+
+
+@routes.get("/artifacts/{name}")
+async def artifact(request):
+    # Only content-addressed artifacts from the manifest are served, never
+    # arbitrary files from output/ (databases, caches, usage files)
+    digest = os.path.splitext(os.path.basename(request.match_info["name"]))[0]
+    record = await asyncio.to_thread(output_store.get, digest)
+    if not record or not os.path.isfile(record["path"]):
+        raise web.HTTPNotFound(text="Unknown artifact")
+    return web.FileResponse(record["path"])
+
+
+@routes.get("/artifacts")
+async def list_artifacts(request):
+    records = await asyncio.to_thread(
+        output_store.find,
+        source_gif=output_store.giphy_id(request.query.get("source_gif")),
+        prompt=request.query.get("prompt"),
+        provider=request.query.get("provider"),
+    )
+    return web.json_response(records)
+
+
+@routes.get("/status")
+async def status(request):
+    return web.json_response({
+        "providers": request.app["scheduler"].snapshot(),
+        "generations": len(request.app["generations"]),
+    })
+
+
+# -----------------------------
+# APP LIFECYCLE
+# -----------------------------
+
+async def on_startup(app):
+    app["http"] = ClientSession(timeout=ClientTimeout(total=60))
+    # Reattach to async jobs left running by the previous process. Runs in the
+    # background so a restart doesn't wait on the job database or provider imports.
+    resumable = [name for name in app["providers"] if name in job_store.RESUMERS]
+    if resumable:
+        app["resume"] = asyncio.get_running_loop().run_in_executor(
+            None, job_store.resume_pending_jobs, resumable,
+        )
+
+
+async def on_cleanup(app):
+    for generation in app["generations"].values():
+        generation["task"].cancel()
+    await app["http"].close()
+    await asyncio.to_thread(app["scheduler"].shutdown, False)
+
+
+def create_app():
+    app = web.Application()
+    app["providers"], app["veo_credentials"], app["analyzer"] = load_providers()
+    app["scheduler"] = JobScheduler()
+    app["generations"] = {}
+    app["search_cache"] = {}
+    app["ids"] = itertools.count(int(time.time()))
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    print("🦊 TAL MEME SERVICE")
+    print(f"🌐 Listening on http://{HOST}:{PORT}")
+    web.run_app(create_app(), host=HOST, port=PORT, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import time
 import requests
 import json
 from dotenv import load_dotenv
+import job_scheduler
+import job_store
 
 # Load environment variables (for Giphy)
 load_dotenv()
@@ -100,6 +102,7 @@ def generate_video_with_legnext(action_description):
         print("🚀 Sending request to Legnext API...")
         response = requests.post(url, json=payload, headers=headers)
         
+        job_scheduler.note_rate_limit(response)
         if response.status_code != 200:
             print(f"❌ Error: {response.text}")
             return None
@@ -112,9 +115,9 @@ def generate_video_with_legnext(action_description):
         
         if job_id:
             print(f"\n🆔 Job ID: {job_id}")
-            print(f"⏳ Video generation has started.")
-            print(f"👉 Please check your Legnext Dashboard to view/download the video.")
-            print(f"   (The API is asynchronous, so the video isn't returned immediately here)")
+            print(f"⏳ Video generation has started. Polling for the result...")
+            local_id = job_store.record_submission("legnext", job_id, full_prompt, {"videoType": payload["videoType"]})
+            data['video_url'] = job_store.track(local_id, poll_legnext_job, job_id)
         else:
             print("⚠️ No Job ID returned, but request was successful.")
             
@@ -124,9 +127,38 @@ def generate_video_with_legnext(action_description):
         print(f"❌ Error calling Legnext: {e}")
         return None
 
+def poll_legnext_job(job_id, interval=10):
+    """Poll a Legnext job until it finishes. Returns the first video URL or None."""
+    url = f"https://api.legnext.ai/api/v1/job/{job_id}"
+    headers = {"x-api-key": LEGNEXT_API_KEY}
+    
+    while True:
+        time.sleep(interval)
+        response = requests.get(url, headers=headers, timeout=30)
+        response.raise_for_status()
+        
+        job = response.json()
+        status = job.get('status')
+        print(f"📡 Status: {status}")
+        
+        if status == "completed":
+            output = job.get('output') or {}
+            urls = output.get('video_urls') or output.get('image_urls') or []
+            if urls:
+                print(f"\n🎉 VIDEO READY: {urls[0]}")
+                return urls[0]
+            return None
+        
+        if status == "failed":
+            print(f"❌ Legnext generation failed: {job.get('error')}")
+            return None
+
 def main():
     print("🦊 TAL MEME GENERATOR (MIDJOURNEY/LEGNEXT EDITION)")
     
+    # Pick up jobs from a previous run instead of paying for them again
+    job_store.resume_pending_jobs(["legnext"])
+    
     # 1. Search Giphy
     query = input("Enter search query (e.g., 'dancing', 'waving'): ") or "funny"
     gifs = search_giphy(query)
@@ -144,7 +176,7 @@ def main():
     # 3. Generate
     generate_video_with_legnext(action)
     
-    print("\n✨ Done! Check your Legnext Dashboard.")
+    print("\n✨ Done!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import threading
+import requests
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configuration
+CACHE_FILE = "output/.model_cache.json"
+CACHE_TTL = 24 * 3600          # Seconds before a probed model is re-checked
+PROBE_TIMEOUT = 10             # Probes must be cheap - never wait like a generation request
+
+_lock = threading.Lock()
+
+
+class ModelUnavailable(Exception):
+    """Raised by a generation attempt when the provider rejected the model id itself."""
+
+
+def _error_body(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def is_openai_model_error(response):
+    """OpenAI flags the offending field: ``error.param == "model"`` or ``model_not_found``."""
+    if response.status_code not in (400, 404):
+        return False
+    error = _error_body(response).get("error") or {}
+    return error.get("param") == "model" or error.get("code") == "model_not_found"
+
+
+def is_vertex_model_error(response):
+    """Vertex answers an unknown publisher model with 404 NOT_FOUND."""
+    if response.status_code != 404:
+        return False
+    return (_error_body(response).get("error") or {}).get("status") == "NOT_FOUND"
+
+
+def is_kling_model_error(response):
+    """Kling reports bad parameters as code 1200/1201; only count it when model_name is named."""
+    if response.status_code != 400:
+        return False
+    body = _error_body(response)
+    return body.get("code") in (1200, 1201) and "model_name" in str(body.get("message", ""))
+
+
+# -----------------------------
+# CACHE
+# -----------------------------
+
+def _load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_FILE) or ".", exist_ok=True)
+    tmp_path = f"{CACHE_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def cached_status(provider, model):
+    """True / False if the model was checked within the TTL, otherwise None."""
+    with _lock:
+        entry = _load_cache().get(provider, {}).get(model)
+    if not entry or time.time() - entry["checked_at"] > CACHE_TTL:
+        return None
+    return entry["available"]
+
+
+def record_status(provider, model, available, reason=None):
+    with _lock:
+        cache = _load_cache()
+        cache.setdefault(provider, {})[model] = {
+            "available": available,
+            "checked_at": time.time(),
+            "reason": reason,
+        }
+        _save_cache(cache)
+
+
+def mark_unavailable(provider, model, reason=None):
+    print(f"⚠️ {provider} model '{model}' unavailable, skipping it for {CACHE_TTL // 3600}h")
+    record_status(provider, model, False, reason)
+
+
+def mark_available(provider, model):
+    if cached_status(provider, model) is not True:
+        record_status(provider, model, True)
+
+
+# -----------------------------
+# RESOLUTION
+# -----------------------------
+
+def candidate_models(provider, candidates, probe=None):
+    """Filter an ordered candidate list down to models worth trying.
+
+    Cached results are used while fresh; otherwise ``probe(model)`` is called
+    (it returns True, False, or None when it can't tell) and the answer is
+    cached. Models known to be unavailable are dropped. If every candidate
+    is known-bad the full list is returned so the caller still gets a try.
+    """
+    usable = []
+    for model in candidates:
+        status = cached_status(provider, model)
+        if status is None and probe:
+            try:
+                status = probe(model)
+            except Exception as e:
+                print(f"⚠️ Could not probe {provider} model '{model}': {e}")
+                status = None
+            if status is not None:
+                record_status(provider, model, status, None if status else "probe")
+        if status is not False:
+            usable.append(model)
+
+    if not usable:
+        print(f"⚠️ All {provider} models are marked unavailable, trying them anyway")
+        return list(candidates)
+    return usable
+
+
+def with_fallback(provider, candidates, attempt, probe=None):
+    """Call ``attempt(model)`` for each usable model until one does not raise ModelUnavailable.
+
+    Only a non-None result proves the model works; a None (5xx, 429, network
+    error) says nothing about the model, so the cache is left untouched.
+    """
+    for model in candidate_models(provider, candidates, probe):
+        try:
+            result = attempt(model)
+        except ModelUnavailable as e:
+            mark_unavailable(provider, model, str(e))
+            continue
+        if result is not None:
+            mark_available(provider, model)
+        return result
+    print(f"❌ No working {provider} model among {candidates}")
+    return None
+
+
+# -----------------------------
+# PROBES
+# -----------------------------
+
+def openai_probe(api_key):
+    """Probe backed by a single GET /v1/models listing, fetched lazily and reused."""
+    listing = {}
+
+    def probe(model):
+        if "ids" not in listing:
+            response = requests.get(
+                "https://api.openai.com/v1/models",
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=PROBE_TIMEOUT,
+            )
+            response.raise_for_status()
+            listing["ids"] = {m["id"] for m in response.json().get("data", [])}
+        return model in listing["ids"]
+
+    return probe
+
+
+def vertex_probe(access_token, location="us-central1"):
+    """Probe that asks Vertex AI for the publisher model's metadata (no generation)."""
+
+    def probe(model):
+        url = f"https://{location}-aiplatform.googleapis.com/v1beta1/publishers/google/models/{model}"
+        response = requests.get(url, headers={"Authorization": f"Bearer {access_token}"}, timeout=PROBE_TIMEOUT)
+        if response.status_code == 200:
+            return True
+        if response.status_code == 404:
+            return False
+        return None
+
+    return probe
+
+
+def main():
+    print(f"\n{'='*60}")
+    print(f"MODEL CAPABILITY CACHE ({CACHE_FILE})")
+    print(f"{'='*60}")
+
+    cache = _load_cache()
+    if not cache:
+        print("(empty - models are probed the first time a generator runs)")
+    for provider, models in cache.items():
+        for model, entry in models.items():
+            age = (time.time() - entry["checked_at"]) / 3600
+            flag = "✅" if entry["available"] else "❌"
+            stale = " (stale)" if age * 3600 > CACHE_TTL else ""
+            print(f"{flag} {provider:10} {model:28} checked {age:.1f}h ago{stale}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import os
+import io
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from urllib.parse import urlparse
+
+# Configuration
+STORE_DIR = "output/store"
+MANIFEST_PATH = "output/manifest.db"
+THUMBNAIL_SIZE = 128   # Longest side of the still thumbnail
+PREVIEW_SIZE = 256     # Longest side of the animated preview
+PREVIEW_MAX_FRAMES = 24
+
+IMAGE_EXTENSIONS = (".gif", ".png", ".jpg", ".jpeg", ".webp")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm")
+
+# blobs: one row per stored file (content hash). manifest: one row per
+# distinct (hash, source GIF, prompt, provider, params) that produced it.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash       TEXT PRIMARY KEY,
+    path       TEXT NOT NULL,
+    ext        TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    thumbnail  TEXT,
+    preview    TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS manifest (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash       TEXT NOT NULL REFERENCES blobs(hash),
+    source_gif TEXT,
+    prompt     TEXT,
+    provider   TEXT,
+    params     TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS manifest_unique ON manifest(
+    hash, IFNULL(source_gif, ''), IFNULL(prompt, ''), IFNULL(provider, ''), params
+);
+CREATE INDEX IF NOT EXISTS manifest_hash ON manifest(hash);
+CREATE INDEX IF NOT EXISTS manifest_source ON manifest(source_gif);
+CREATE INDEX IF NOT EXISTS manifest_prompt ON manifest(prompt);
+CREATE INDEX IF NOT EXISTS manifest_provider ON manifest(provider);
+"""
+
+MANIFEST_COLUMNS = (
+    "m.id, m.hash, m.source_gif, m.prompt, m.provider, m.params, m.created_at, "
+    "b.path, b.ext, b.size, b.thumbnail, b.preview"
+)
+
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect(db_path=MANIFEST_PATH):
+    """Open the manifest, creating it in WAL mode on first use."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    with _init_lock:
+        if db_path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _initialized.add(db_path)
+    return conn
+
+
+def giphy_id(source):
+    """The Giphy id for a bare id or any Giphy media/page URL; other values pass through.
+
+    ``source_gif`` is always stored under this key so the CLI (which has the
+    search result id) and the service (which gets a URL) index the same GIF
+    the same way.
+    """
+    if not source or "giphy.com/" not in source:
+        return source
+    parts = [p for p in urlparse(source).path.split("/") if p]
+    if not parts:
+        return source
+    if len(parts) == 1:
+        # i.giphy.com/<id>.gif
+        return os.path.splitext(parts[0])[0]
+    if parts[0] == "gifs":
+        # giphy.com/gifs/<slug>-<id>
+        return parts[-1].rsplit("-", 1)[-1]
+    # media*.giphy.com/media/[v1.../]<id>/giphy.gif, giphy.com/embed/<id>
+    return parts[-2] if "." in parts[-1] else parts[-1]
+
+
+def artifact_path(digest, ext, suffix="", store_dir=STORE_DIR):
+    """``output/store/ab/abcdef...<suffix><ext>`` - sharded by the first two hex chars."""
+    return os.path.join(store_dir, digest[:2], f"{digest}{suffix}{ext}")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# DERIVED PREVIEWS
+# -----------------------------
+
+def _image_derivatives(data, digest, store_dir):
+    """Still JPEG thumbnail plus a small animated GIF preview for animated inputs."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    n_frames = getattr(image, "n_frames", 1)
+
+    thumb = image.convert("RGB")
+    thumb.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+    buf = io.BytesIO()
+    thumb.save(buf, format="JPEG", quality=80)
+    thumb_path = artifact_path(digest, ".jpg", ".thumb", store_dir)
+    _write_atomic(thumb_path, buf.getvalue())
+
+    preview_path = None
+    if n_frames > 1:
+        step = max(1, n_frames // PREVIEW_MAX_FRAMES)
+        frames = []
+        durations = []
+        for index in range(0, n_frames, step):
+            image.seek(index)
+            frame = image.convert("RGB")
+            frame.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE))
+            frames.append(frame)
+            durations.append(image.info.get("duration", 100) * step)
+        buf = io.BytesIO()
+        frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:],
+                       duration=durations, loop=0, optimize=True)
+        preview_path = artifact_path(digest, ".gif", ".preview", store_dir)
+        _write_atomic(preview_path, buf.getvalue())
+
+    return thumb_path, preview_path
+
+
+def _video_derivatives(path, digest, store_dir):
+    """Thumbnail from the first video frame. Needs imageio with ffmpeg; skipped otherwise."""
+    try:
+        import imageio.v3 as iio # pip install imageio[ffmpeg]
+        from PIL import Image
+    except ImportError:
+        return None, None
+
+    frame = Image.fromarray(iio.imread(path, index=0))
+    frame.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+    buf = io.BytesIO()
+    frame.convert("RGB").save(buf, format="JPEG", quality=80)
+    thumb_path = artifact_path(digest, ".jpg", ".thumb", store_dir)
+    _write_atomic(thumb_path, buf.getvalue())
+    return thumb_path, None
+
+
+def make_derivatives(data, path, digest, ext, store_dir=STORE_DIR):
+    try:
+        if ext in IMAGE_EXTENSIONS:
+            return _image_derivatives(data, digest, store_dir)
+        if ext in VIDEO_EXTENSIONS:
+            return _video_derivatives(path, digest, store_dir)
+    except Exception as e:
+        print(f"⚠️ Could not build previews for {path}: {e}")
+    return None, None
+
+
+# -----------------------------
+# STORE / LOOKUP
+# -----------------------------
+
+def put_bytes(data, ext, source_gif=None, prompt=None, provider=None, params=None,
+              store_dir=STORE_DIR, db_path=MANIFEST_PATH):
+    """Store ``data`` under its SHA-256 and index it. Returns the manifest record.
+
+    Identical content is written (and previewed) once; storing it again
+    with different metadata only adds a manifest row pointing at it.
+    ``source_gif`` is the Giphy id of the reference GIF - pass URLs through
+    ``giphy_id`` first so ``find(source_gif=...)`` matches every entry point.
+    """
+    ext = ext if ext.startswith(".") else f".{ext}"
+    ext = ext.lower()
+    digest = hashlib.sha256(data).hexdigest()
+
+    blob = get(digest, db_path)
+    if not blob or not os.path.exists(blob["path"]):
+        path = artifact_path(digest, ext, store_dir=store_dir)
+        _write_atomic(path, data)
+        thumbnail, preview = make_derivatives(data, path, digest, ext, store_dir)
+        with closing(_connect(db_path)) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO blobs (hash, path, ext, size, thumbnail, preview, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, path, ext, len(data), thumbnail, preview, time.time()),
+            )
+
+    params_json = json.dumps(params or {}, sort_keys=True)
+    with closing(_connect(db_path)) as conn, conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO manifest (hash, source_gif, prompt, provider, params, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (digest, source_gif, prompt, provider, params_json, time.time()),
+        )
+        row = conn.execute(
+            f"SELECT {MANIFEST_COLUMNS} FROM manifest m JOIN blobs b ON b.hash = m.hash "
+            "WHERE m.hash = ? AND IFNULL(m.source_gif, '') = IFNULL(?, '') "
+            "AND IFNULL(m.prompt, '') = IFNULL(?, '') AND IFNULL(m.provider, '') = IFNULL(?, '') "
+            "AND m.params = ?",
+            (digest, source_gif, prompt, provider, params_json),
+        ).fetchone()
+    return dict(row)
+
+
+def put_file(src_path, **metadata):
+    """Store an existing file (its original name is kept as ``params['original_name']``)."""
+    with open(src_path, 'rb') as f:
+        data = f.read()
+    params = dict(metadata.pop("params", None) or {})
+    params.setdefault("original_name", os.path.basename(src_path))
+    return put_bytes(data, os.path.splitext(src_path)[1], params=params, **metadata)
+
+
+def get(digest, db_path=MANIFEST_PATH):
+    """The stored file for a content hash (path, size, previews), or None."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT * FROM blobs WHERE hash = ?", (digest,)).fetchone()
+    return dict(row) if row else None
+
+
+def find(source_gif=None, prompt=None, provider=None, db_path=MANIFEST_PATH):
+    """Indexed lookup of artifacts by any combination of source GIF, prompt and provider."""
+    clauses, args = [], []
+    for column, value in (("source_gif", source_gif), ("prompt", prompt), ("provider", provider)):
+        if value is not None:
+            clauses.append(f"m.{column} = ?")
+            args.append(value)
+    query = f"SELECT {MANIFEST_COLUMNS} FROM manifest m JOIN blobs b ON b.hash = m.hash"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(query + " ORDER BY m.created_at DESC", args).fetchall()
+    return [dict(row) for row in rows]
+
+
+def main():
+    """Import existing files into the store: python output_store.py output/*.png"""
+    paths = sys.argv[1:]
+    if not paths:
+        print("Usage: python output_store.py <file> [<file> ...]")
+        return
+
+    for path in paths:
+        record = put_file(path)
+        print(f"✅ {path} -> {record['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import io
+import os
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+import streaming_ingest
+
+# Configuration
+PREFETCH_TOP_N = 5
+PREFETCH_BANDWIDTH = 512 * 1024   # Bytes/second shared by all prefetch downloads
+PREFETCH_DIR = "downloads/prefetch"
+CHUNK_SIZE = 16384
+
+
+class BandwidthLimiter:
+    """Token bucket shared by every prefetch download."""
+
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.tokens = bytes_per_second
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount, cancelled):
+        """Wait until ``amount`` bytes fit the budget. Returns False if cancelled meanwhile."""
+        with self.lock:
+            if self.rate is None:
+                return not cancelled.is_set()
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going into debt keeps chunks larger than the bucket from stalling forever
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            return not cancelled.wait(wait)
+        return not cancelled.is_set()
+
+    def unlimit(self):
+        with self.lock:
+            self.rate = None
+
+
+class Prefetcher:
+    """Speculatively fetch the small renditions of search results while the user chooses.
+
+    For each of the top ``top_n`` results this downloads the small rendition
+    under a shared bandwidth cap, extracts its middle frame and, when
+    ``analyze_frame`` is given, pre-runs the action analysis on it. Work runs
+    silently in the background so it doesn't interleave with the input
+    prompt; ``select`` cancels everything except the chosen GIF.
+    """
+
+    def __init__(self, results, top_n=PREFETCH_TOP_N, bandwidth=PREFETCH_BANDWIDTH,
+                 analyze_frame=None, output_dir=PREFETCH_DIR):
+        self.analyze_frame = analyze_frame
+        self.output_dir = output_dir
+        self.limiter = BandwidthLimiter(bandwidth)
+        self.entries = {}
+
+        candidates = [r for r in results[:top_n] if r.get('small_url')]
+        self.pool = ThreadPoolExecutor(max_workers=max(1, len(candidates)), thread_name_prefix="prefetch")
+        os.makedirs(output_dir, exist_ok=True)
+        for result in candidates:
+            entry = {"result": result, "cancelled": threading.Event()}
+            entry["future"] = self.pool.submit(self._prefetch, entry)
+            self.entries[result['id']] = entry
+
+    def _prefetch(self, entry):
+        result, cancelled = entry["result"], entry["cancelled"]
+        path = os.path.join(self.output_dir, f"small_{result['id']}.gif")
+
+        response = requests.get(result['small_url'], stream=True, timeout=30)
+        response.raise_for_status()
+        data = bytearray()
+        with response:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if not self.limiter.consume(len(chunk), cancelled):
+                    return None
+                data += chunk
+
+        if cancelled.is_set():
+            return None
+        with open(path, 'wb') as f:
+            f.write(data)
+
+        from PIL import Image
+
+        n_frames = getattr(Image.open(io.BytesIO(data)), "n_frames", 1)
+        keyframe = streaming_ingest.frame_jpeg_b64(bytes(data), n_frames // 2)
+
+        prefetched = {"path": path, "keyframe_b64": keyframe, "action": None}
+        if self.analyze_frame and not cancelled.is_set():
+            prefetched["action"] = self.analyze_frame(keyframe)
+        return prefetched
+
+    def select(self, gif_id, timeout=None):
+        """Cancel prefetching of every other result and return the chosen one's data.
+
+        Returns ``{"path", "keyframe_b64", "action"}``, or None if the GIF wasn't
+        prefetched or its prefetch failed.
+        """
+        for other_id, entry in self.entries.items():
+            if other_id != gif_id:
+                entry["cancelled"].set()
+                entry["future"].cancel()
+
+        # The user is waiting on this one now, so let it use the full connection
+        self.limiter.unlimit()
+
+        entry = self.entries.get(gif_id)
+        result = None
+        if entry:
+            try:
+                result = entry["future"].result(timeout=timeout)
+            except Exception as e:
+                print(f"⚠️ Prefetch of selected GIF unavailable: {e}")
+        self.pool.shutdown(wait=False)
+        return result
+
+    def cancel(self):
+        for entry in self.entries.values():
+            entry["cancelled"].set()
+            entry["future"].cancel()
+        self.pool.shutdown(wait=False)
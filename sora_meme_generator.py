@@ -3,6 +3,9 @@ import time
 import requests
 import base64
 from dotenv import load_dotenv
+import job_scheduler
+import job_store
+import model_registry
 
 load_dotenv()
 
@@ -10,6 +13,9 @@ OPENAI_KEY = os.getenv("OPEN_AI_KEY")
 GIPHY_API_KEY = os.getenv("GIPHY_API_KEY")
 
 SORA_MODEL = "sora-1.1"  # official model
+# Fallback order, filtered by model_registry. sora-2-pro is left out on purpose:
+# it costs several times more per second, so it must be chosen explicitly.
+SORA_MODELS = [SORA_MODEL, "sora-2"]
 
 TAL_DESCRIPTION = """
 A stylized anthropomorphic fox character named Tal. 
@@ -66,7 +72,7 @@ def search_giphy(query):
 
 def sora_generate_video(action_text):
     print("\n============================================================")
-    print(f"GENERATING VIDEO WITH SORA ({SORA_MODEL})")
+    print(f"GENERATING VIDEO WITH SORA ({' -> '.join(SORA_MODELS)})")
     print("============================================================")
 
     # Encode reference image
@@ -82,7 +88,6 @@ def sora_generate_video(action_text):
     prompt = f"{TAL_DESCRIPTION}\nACTION: {action_text}\nHigh quality 3D cinematic animation."
 
     payload = {
-        "model": SORA_MODEL,
         "prompt": prompt,
         "max_output_tokens": 2048
     }
@@ -95,27 +100,55 @@ def sora_generate_video(action_text):
         "Content-Type": "application/json"
     }
 
-    # Create Sora job
-    print("🚀 Sending job to Sora...")
-    job = requests.post("https://api.openai.com/v1/videos", json=payload, headers=headers)
+    # Create Sora job, falling back through SORA_MODELS if a model id is rejected
+    def create_job(model):
+        print(f"🚀 Sending job to Sora ({model})...")
+        job = requests.post("https://api.openai.com/v1/videos", json={**payload, "model": model}, headers=headers)
 
-    if job.status_code != 200:
-        print(f"❌ Error ({job.status_code}): {job.text}")
+        if model_registry.is_openai_model_error(job):
+            raise model_registry.ModelUnavailable(f"{job.status_code}: {job.text[:200]}")
+
+        job_scheduler.note_rate_limit(job)
+        if job.status_code != 200:
+            print(f"❌ Error ({job.status_code}): {job.text}")
+            return None
+
+        return model, job.json()["id"]
+
+    created = model_registry.with_fallback(
+        "sora", SORA_MODELS, create_job, probe=model_registry.openai_probe(OPENAI_KEY),
+    )
+    if not created:
         return None
 
-    job_id = job.json()["id"]
+    model, job_id = created
     print(f"⏳ Job ID: {job_id}")
+    local_id = job_store.record_submission("sora", job_id, prompt, {"model": model})
 
-    # Poll job status
+    return job_store.track(local_id, poll_sora_job, job_id)
+
+
+def poll_sora_job(job_id):
+    """Poll a Sora job until it finishes. Returns the video URL or None."""
+    headers = {
+        "Authorization": f"Bearer {OPENAI_KEY}",
+        "Content-Type": "application/json"
+    }
     poll_url = f"https://api.openai.com/v1/videos/{job_id}"
 
     while True:
         time.sleep(5)
-        poll = requests.get(poll_url, headers=headers).json()
+        response = requests.get(poll_url, headers=headers, timeout=30)
+        response.raise_for_status()
+        poll = response.json()
         status = poll.get("status")
 
         print(f"📡 Status: {status}")
 
+        if not status:
+            print(f"❌ Unexpected Sora response: {poll}")
+            return None
+
         if status == "completed":
             video_url = poll["video"]["url"]
             print(f"\n🎉 VIDEO READY: {video_url}")
@@ -133,6 +166,9 @@ def sora_generate_video(action_text):
 def main():
     print("🦊 TAL MEME GENERATOR (SORA EDITION)")
 
+    # Pick up jobs from a previous run instead of paying for them again
+    resumed = job_store.resume_pending_jobs(["sora"])
+
     query = input("Enter search query: ") or "funny"
     gifs = search_giphy(query)
     if not gifs: return
@@ -145,6 +181,9 @@ def main():
 
     sora_generate_video(action)
 
+    for thread in resumed:
+        thread.join()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+import io
+import base64
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+CHUNK_SIZE = 16384
+JPEG_QUALITY = 90
+
+
+class GifStreamParser:
+    """Incremental GIF block parser that tracks where each frame ends.
+
+    Bytes are fed as they arrive from the network. The parser only walks
+    block headers and sub-block lengths - it never decodes pixels - so it
+    costs O(1) per byte. ``frame_ends[k]`` is the byte offset just past
+    frame ``k``; ``data[:frame_ends[k]] + b';'`` is a valid GIF holding
+    frames 0..k.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.frame_ends = []
+        self.complete = False
+        self._pos = 0
+        self._state = "header"
+        self._in_image = False
+
+    def feed(self, chunk):
+        """Append ``chunk``; returns the number of frames completed by it."""
+        before = len(self.frame_ends)
+        self.data += chunk
+        while not self.complete and self._step():
+            pass
+        return len(self.frame_ends) - before
+
+    def _step(self):
+        data, pos = self.data, self._pos
+
+        if self._state == "header":
+            if len(data) < 13:
+                return False
+            if data[:6] not in (b"GIF87a", b"GIF89a"):
+                raise ValueError("Not a GIF")
+            packed = data[10]
+            gct = 3 * (2 ** ((packed & 0x07) + 1)) if packed & 0x80 else 0
+            self._pos = 13 + gct
+            self._state = "block"
+            return True
+
+        if self._state == "block":
+            if pos >= len(data):
+                return False
+            introducer = data[pos]
+            if introducer == 0x3B:  # Trailer
+                self.complete = True
+                return False
+            if introducer == 0x21:  # Extension: introducer + label, then sub-blocks
+                if pos + 2 > len(data):
+                    return False
+                self._pos = pos + 2
+                self._in_image = False
+            elif introducer == 0x2C:  # Image descriptor (+ local colour table + LZW code size)
+                if pos + 10 > len(data):
+                    return False
+                packed = data[pos + 9]
+                lct = 3 * (2 ** ((packed & 0x07) + 1)) if packed & 0x80 else 0
+                self._pos = pos + 10 + lct + 1
+                self._in_image = True
+            else:
+                raise ValueError(f"Corrupt GIF: unexpected block 0x{introducer:02x} at {pos}")
+            self._state = "subblocks"
+            return True
+
+        # Sub-blocks: length byte followed by that many bytes, ended by a zero length
+        if pos >= len(data):
+            return False
+        size = data[pos]
+        self._pos = pos + 1 + size
+        if size == 0:
+            if self._in_image:
+                self.frame_ends.append(self._pos)
+            self._state = "block"
+        return True
+
+    def prefix(self, index):
+        """A standalone GIF holding frames 0..index of what has arrived so far."""
+        return bytes(self.data[:self.frame_ends[index]]) + b";"
+
+
+def frame_jpeg_b64(gif_bytes, index, quality=JPEG_QUALITY):
+    """Decode frame ``index`` of an in-memory GIF to a base64 JPEG."""
+    from PIL import Image
+
+    gif = Image.open(io.BytesIO(gif_bytes))
+    gif.seek(index)
+    buf = io.BytesIO()
+    gif.convert('RGB').save(buf, format="JPEG", quality=quality)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def _target_reached(parser, frame_count, content_length):
+    """Has the frame we want to analyze (roughly the middle one) fully arrived?"""
+    if not parser.frame_ends:
+        return None
+    if frame_count:
+        target = frame_count // 2
+        return target if len(parser.frame_ends) > target else None
+    if content_length:
+        # Frames are roughly evenly sized, so the frame crossing the byte midpoint
+        # is close to the middle frame
+        if parser.frame_ends[-1] >= content_length // 2:
+            return len(parser.frame_ends) - 1
+        return None
+    return 0
+
+
+def ingest_gif(gif_url, output_path, analyze_frame, frame_count=None):
+    """Download a GIF while analyzing it.
+
+    ``analyze_frame(jpeg_b64)`` runs on a worker thread as soon as the middle
+    frame has arrived (``frame_count`` from Giphy pins it exactly; otherwise
+    Content-Length is used to estimate it). The file is written to
+    ``output_path`` as chunks arrive. Returns ``(downloaded, analysis)``.
+    """
+    print(f"\n📥 Streaming GIF for reference...")
+    parser = GifStreamParser()
+    analysis = None
+    parse_ok = True
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        try:
+            response = requests.get(gif_url, stream=True, timeout=30)
+            response.raise_for_status()
+            content_length = int(response.headers.get('Content-Length') or 0)
+
+            with open(output_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    if not parse_ok:
+                        continue
+                    try:
+                        parser.feed(chunk)
+                    except ValueError as e:
+                        print(f"⚠️ Streaming parse stopped ({e}), will analyze after download")
+                        parse_ok = False
+                        continue
+
+                    if analysis is None:
+                        target = _target_reached(parser, frame_count, content_length)
+                        if target is not None:
+                            print(f"🎞️ Frame {target} arrived after {len(parser.data) / 1024:.0f} KB, analyzing while download continues...")
+                            # Snapshot the prefix so the worker never reads the growing buffer
+                            prefix = parser.prefix(target)
+                            analysis = pool.submit(_safe_analyze, analyze_frame, frame_jpeg_b64, prefix, target)
+        except Exception as e:
+            print(f"❌ Error downloading: {e}")
+            return False, analysis.result() if analysis else None
+
+        print(f"✅ Downloaded to: {output_path}")
+
+        if analysis is None:
+            # Tiny or unparseable file: fall back to the middle frame of the whole thing
+            analysis = pool.submit(_safe_analyze, analyze_frame, _middle_frame_b64, output_path)
+        return True, analysis.result()
+
+
+def _safe_analyze(analyze_frame, extract, *args):
+    """Runs on the worker: a frame that fails to decode yields None instead of raising."""
+    try:
+        return analyze_frame(extract(*args))
+    except Exception as e:
+        print(f"⚠️ Could not analyze frame: {e}")
+        return None
+
+
+def _middle_frame_b64(gif_path, quality=JPEG_QUALITY):
+    from PIL import Image
+
+    with open(gif_path, 'rb') as f:
+        data = f.read()
+    n_frames = getattr(Image.open(io.BytesIO(data)), "n_frames", 1)
+    return frame_jpeg_b64(data, n_frames // 2, quality)
@@ -0,0 +1,58 @@
+import os
+import json
+import types
+import tempfile
+
+from aiohttp.test_utils import AioHTTPTestCase
+
+import job_store
+import meme_service
+from job_scheduler import JobScheduler
+
+
+class GenerationEndToEndTest(AioHTTPTestCase):
+    """POST /generations through the real scheduler to a stub Kling module."""
+
+    async def get_application(self):
+        self.calls = []
+
+        def generate_video_with_kling(action):
+            self.calls.append(action)
+            return f"output/kling_{action}.mp4"
+
+        stub = types.SimpleNamespace(generate_video_with_kling=generate_video_with_kling)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        usage_file = os.path.join(self.tmp_dir.name, "usage.json")
+        self.resumed = []
+        self.originals = (meme_service.load_providers, meme_service.JobScheduler, job_store.resume_pending_jobs)
+        meme_service.load_providers = lambda: ({"kling": stub}, None, None)
+        meme_service.JobScheduler = lambda: JobScheduler(usage_file=usage_file)
+        job_store.resume_pending_jobs = self.resumed.append
+        return meme_service.create_app()
+
+    async def asyncTearDown(self):
+        await super().asyncTearDown()
+        meme_service.load_providers, meme_service.JobScheduler, job_store.resume_pending_jobs = self.originals
+        self.tmp_dir.cleanup()
+
+    async def test_generation_completes(self):
+        response = await self.client.post("/generations", json={"action": "dance"})
+        self.assertEqual(response.status, 202)
+        gen_id = (await response.json())["id"]
+
+        events = await self.client.get(f"/generations/{gen_id}/events")
+        states = [json.loads(line[len("data: "):])["state"]
+                  for line in (await events.text()).splitlines() if line.startswith("data: ")]
+        self.assertEqual(states, ["queued", "generating", "completed"])
+        self.assertEqual(self.calls, ["dance"])
+
+        status = await (await self.client.get(f"/generations/{gen_id}")).json()
+        self.assertEqual(status["artifact"], "output/kling_dance.mp4")
+
+    async def test_startup_resumes_pending_jobs(self):
+        await self.app["resume"]
+        self.assertEqual(self.resumed, [["kling"]])
+
+    async def test_search_rejects_non_integer_limit(self):
+        response = await self.client.get("/search", params={"q": "dance", "limit": "abc"})
+        self.assertEqual(response.status, 400)
@@ -1,12 +1,20 @@
 import os
+import io
 import json
 import base64
 import time
+import threading
 import requests
 from dotenv import load_dotenv
+import job_scheduler
 from google.oauth2 import service_account
 from google.auth.transport import requests as google_requests
 from google.cloud import aiplatform
+import output_store
+import streaming_ingest
+import giphy_search
+import prefetch
+import model_registry
 
 # Load environment variables
 load_dotenv()
@@ -15,11 +23,19 @@ load_dotenv()
 GIPHY_API_KEY = os.getenv("GIPHY_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # For Gemini analysis
 
+# Pre-run Gemini on the top results while the user is choosing (costs one call per prefetched GIF)
+PREFETCH_ANALYZE = os.getenv("PREFETCH_ANALYZE", "0") == "1"
+
 # Vertex AI Configuration
 CREDENTIALS_FILE = "vertex_credentials.json"
 REFERENCE_IMAGE_PATH = "reference image/tal.jpg"
 LOCATION = "us-central1"
 
+# Tried in order; unavailable ones are skipped via model_registry.
+# - veo-3.x (Preview, very limited quota)
+# - veo-2.0-generate-001 (Stable, generally available)
+MODEL_IDS = ["veo-3.1-generate", "veo-3.0-generate-001", "veo-2.0-generate-001"]
+
 def load_credentials():
     """Load service account credentials from JSON file."""
     if not os.path.exists(CREDENTIALS_FILE):
@@ -76,11 +92,7 @@ def search_giphy(query, limit=10):
         
         results = []
         for i, gif in enumerate(gifs, 1):
-            results.append({
-                'id': gif.get('id'),
-                'title': gif.get('title', 'Untitled'),
-                'url': gif.get('images', {}).get('original', {}).get('url'),
-            })
+            results.append(giphy_search.gif_result(gif, query))
             print(f"{i}. {results[-1]['title'][:60]}")
         
         return results
@@ -106,30 +118,13 @@ def download_gif(gif_url, output_path):
         print(f"❌ Error downloading: {e}")
         return False
 
-def analyze_gif_with_gemini(gif_path):
-    """Analyze the GIF using Gemini Vision."""
-    print(f"\n{'='*60}")
-    print(f"ANALYZING GIF WITH GEMINI")
-    print(f"{'='*60}")
-    
+def describe_frame_with_gemini(frame_b64):
+    """Ask Gemini Vision for the action in a base64 JPEG frame."""
     if not GOOGLE_API_KEY:
         print("⚠️ GOOGLE_API_KEY not found. Using fallback description.")
         return "A character performing an action."
 
     try:
-        from PIL import Image
-        
-        # Extract a frame
-        gif = Image.open(gif_path)
-        gif.seek(gif.n_frames // 2) # Middle frame
-        frame = gif.convert('RGB')
-        
-        temp_path = "temp_frame.jpg"
-        frame.save(temp_path)
-        
-        with open(temp_path, 'rb') as f:
-            frame_b64 = base64.b64encode(f.read()).decode()
-            
         api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent?key={GOOGLE_API_KEY}"
         
         prompt = "Describe the ACTION in this image concisely. E.g. 'dancing', 'waving', 'laughing'."
@@ -146,7 +141,6 @@ def analyze_gif_with_gemini(gif_path):
         if response.status_code == 200:
             desc = response.json()['candidates'][0]['content']['parts'][0]['text'].strip()
             print(f"✅ Detected Action: {desc}")
-            if os.path.exists(temp_path): os.remove(temp_path)
             return desc
         else:
             print(f"⚠️ Analysis failed: {response.status_code}")
@@ -156,6 +150,33 @@ def analyze_gif_with_gemini(gif_path):
         print(f"⚠️ Error analyzing GIF: {e}")
         return "character moving"
 
+def analyze_gif_with_gemini(gif_path):
+    """Analyze the GIF using Gemini Vision."""
+    print(f"\n{'='*60}")
+    print(f"ANALYZING GIF WITH GEMINI")
+    print(f"{'='*60}")
+    
+    if not GOOGLE_API_KEY:
+        print("⚠️ GOOGLE_API_KEY not found. Using fallback description.")
+        return "A character performing an action."
+
+    try:
+        from PIL import Image
+        
+        # Extract a frame (encoded in memory, no temp file)
+        gif = Image.open(gif_path)
+        gif.seek(gif.n_frames // 2) # Middle frame
+        frame = gif.convert('RGB')
+        
+        buf = io.BytesIO()
+        frame.save(buf, format="JPEG")
+        frame_b64 = base64.b64encode(buf.getvalue()).decode()
+    except Exception as e:
+        print(f"⚠️ Error analyzing GIF: {e}")
+        return "character moving"
+        
+    return describe_frame_with_gemini(frame_b64)
+
 def generate_veo_video(credentials, project_id, prompt, reference_image_path):
     """Generate video using Veo (Vertex AI)."""
     print(f"\n{'='*60}")
@@ -171,14 +192,6 @@ def generate_veo_video(credentials, project_id, prompt, reference_image_path):
         credentials.refresh(google_requests.Request())
         access_token = credentials.token
         
-        # Endpoint
-        # Available models: 
-        # - veo-2.0-generate-001 (Stable, generally available)
-        # - veo-3.0-generate-001 (Preview, very limited quota)
-        MODEL_ID = "veo-3.1-generate" 
-        
-        endpoint = f"https://{LOCATION}-aiplatform.googleapis.com/v1/projects/{project_id}/locations/{LOCATION}/publishers/google/models/{MODEL_ID}:predict"
-        
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
@@ -198,31 +211,43 @@ def generate_veo_video(credentials, project_id, prompt, reference_image_path):
             }]
         }
         
-        print(f"🚀 Sending request to Vertex AI ({endpoint})...")
-        print("⏳ This may take 1-2 minutes...")
-        
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=180)
-        
-        if response.status_code != 200:
-            print(f"❌ API Error ({response.status_code}): {response.text}")
-            return None
+        def attempt(model_id):
+            endpoint = f"https://{LOCATION}-aiplatform.googleapis.com/v1/projects/{project_id}/locations/{LOCATION}/publishers/google/models/{model_id}:predict"
             
-        result = response.json()
-        predictions = result.get('predictions', [])
-        
-        if not predictions:
-            print("❌ No predictions returned.")
-            return None
+            print(f"🚀 Sending request to Vertex AI ({endpoint})...")
+            print("⏳ This may take 1-2 minutes...")
             
-        video_data = predictions[0]
-        
-        if 'videoBase64' in video_data:
-            return base64.b64decode(video_data['videoBase64'])
-        elif 'gcsUri' in video_data:
-            print(f"⚠️ Video saved to GCS: {video_data['gcsUri']}")
-            return None # Or handle GCS download if needed
+            response = requests.post(endpoint, headers=headers, json=payload, timeout=180)
             
-        return None
+            if model_registry.is_vertex_model_error(response):
+                raise model_registry.ModelUnavailable(f"{response.status_code}: {response.text[:200]}")
+            
+            job_scheduler.note_rate_limit(response)
+            if response.status_code != 200:
+                print(f"❌ API Error ({response.status_code}): {response.text}")
+                return None
+                
+            result = response.json()
+            predictions = result.get('predictions', [])
+            
+            if not predictions:
+                print("❌ No predictions returned.")
+                return None
+                
+            video_data = predictions[0]
+            
+            if 'videoBase64' in video_data:
+                return base64.b64decode(video_data['videoBase64'])
+            elif 'gcsUri' in video_data:
+                print(f"⚠️ Video saved to GCS: {video_data['gcsUri']}")
+                return None # Or handle GCS download if needed
+                
+            return None
+        
+        # Models are probed once (cached for a day) so a wrong id never costs a full request
+        return model_registry.with_fallback(
+            "veo", MODEL_IDS, attempt, probe=model_registry.vertex_probe(access_token, LOCATION),
+        )
 
     except Exception as e:
         print(f"❌ Error generating video: {e}")
@@ -244,15 +269,40 @@ def main():
     gifs = search_giphy(query)
     if not gifs: return
     
-    choice = int(input("Select GIF (1-10): ")) - 1
-    selected_gif = gifs[choice]
+    # Use the user's think time: fetch small renditions of the top results in the background
+    prefetcher = prefetch.Prefetcher(
+        gifs, analyze_frame=describe_frame_with_gemini if PREFETCH_ANALYZE else None,
+    )
+    try:
+        choice = int(input("Select GIF (1-10): ")) - 1
+        selected_gif = gifs[choice]
+    except Exception:
+        prefetcher.cancel()
+        raise
+    prefetched = prefetcher.select(selected_gif['id'])
     
     # 2. Download & Analyze
     os.makedirs("downloads", exist_ok=True)
     gif_path = f"downloads/ref_{selected_gif['id']}.gif"
-    download_gif(selected_gif['url'], gif_path)
-    
-    action = analyze_gif_with_gemini(gif_path)
+    print(f"\n{'='*60}")
+    print(f"DOWNLOADING & ANALYZING GIF WITH GEMINI")
+    print(f"{'='*60}")
+    if prefetched:
+        # Analysis only needs one frame, which the prefetch already has; keep a copy
+        # of the original for reference without making generation wait for it
+        threading.Thread(target=download_gif, args=(selected_gif['url'], gif_path)).start()
+        action = prefetched['action']
+        if action:
+            print(f"⚡ Using prefetched analysis: {action}")
+        else:
+            action = describe_frame_with_gemini(prefetched['keyframe_b64'])
+    else:
+        # The middle frame is analyzed as soon as it arrives, while the rest downloads
+        _, action = streaming_ingest.ingest_gif(
+            selected_gif['url'], gif_path, describe_frame_with_gemini, frame_count=selected_gif['frames'],
+        )
+    if not action:
+        action = "character moving"
     
     # 3. Generate
     prompt = f"A video of Tal the fox character, {action}. The character has smooth golden-brown fur, wearing a black tuxedo. High quality, 3d animation style."
@@ -260,11 +310,10 @@ def main():
     video_bytes = generate_veo_video(credentials, project_id, prompt, REFERENCE_IMAGE_PATH)
     
     if video_bytes:
-        os.makedirs("output", exist_ok=True)
-        output_path = f"output/tal_veo_{selected_gif['id']}.mp4"
-        with open(output_path, 'wb') as f:
-            f.write(video_bytes)
-        print(f"\n✅ SUCCESS! Video saved to: {output_path}")
+        record = output_store.put_bytes(
+            video_bytes, ".mp4", source_gif=output_store.giphy_id(selected_gif['id']), prompt=prompt, provider="veo",
+        )
+        print(f"\n✅ SUCCESS! Video saved to: {record['path']}")
     else:
         print("\n❌ Failed to generate video.")
 